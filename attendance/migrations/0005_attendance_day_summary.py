@@ -0,0 +1,56 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+def backfill_day_summaries(apps, schema_editor):
+    """Compute the new summary fields for existing attendance days."""
+    from attendance.models import summarize_entries
+
+    Attendance = apps.get_model('attendance', 'Attendance')
+    collection = schema_editor.connection.cursor().db_conn[Attendance._meta.db_table]
+    for doc in collection.find({}, {'entries': True}):
+        summary = summarize_entries(doc.get('entries') or [])
+        update = {'$set': {
+            'last_out': summary['last_out'],
+            'worked_seconds': summary['worked_seconds'],
+            'is_open': summary['is_open'],
+            'total_hours': round(summary['worked_seconds'] / 3600, 2),
+        }}
+        # first_in is maintained with $min, which never replaces a null
+        if summary['first_in'] is not None:
+            update['$set']['first_in'] = summary['first_in']
+        else:
+            update['$unset'] = {'first_in': ''}
+        collection.update_one({'_id': doc['_id']}, update)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_leaverequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='first_in',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='is_open',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='last_out',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='worked_seconds',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(backfill_day_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_leaverequest_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaverequest',
+            name='leave_manager_applied',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaverequest',
+            name='leave_employee_applied',
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['-applied_at', '-_id'], name='leave_applied'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['manager', '-applied_at', '-_id'], name='leave_manager_applied'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', '-applied_at', '-_id'], name='leave_employee_applied'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'start_date', '_id'], name='leave_status_start'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'start_date', '_id'], name='leave_employee_start'),
+        ),
+    ]
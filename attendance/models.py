@@ -1,7 +1,147 @@
+import datetime
+
 from django.db import models
 from django.conf import settings
 from djongo import models as mongo_models
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from pymongo.errors import DuplicateKeyError
+
+
+def _mongo_date(value):
+    """DateFields are stored by Djongo as naive midnight datetimes."""
+    return datetime.datetime(value.year, value.month, value.day)
+
+
+def _as_aware(value):
+    """Normalize an entry timestamp (BSON datetime or legacy ISO string) to aware UTC."""
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    return value
+
+
+def summarize_entries(entries):
+    """
+    Compute the per-day summary persisted on Attendance from its entries.
+
+    Only needed to (re)build summaries; check-in/check-out keep them up to
+    date incrementally.
+    """
+    first_in = last_out = None
+    worked_seconds = 0.0
+    is_open = False
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        check_in = _as_aware(entry.get('check_in'))
+        check_out = _as_aware(entry.get('check_out'))
+        if check_in and (first_in is None or check_in < first_in):
+            first_in = check_in
+        if check_out is None:
+            is_open = True
+            continue
+        if last_out is None or check_out > last_out:
+            last_out = check_out
+        if check_in:
+            worked_seconds += (check_out - check_in).total_seconds()
+    return {
+        'first_in': first_in,
+        'last_out': last_out,
+        'worked_seconds': worked_seconds,
+        'is_open': is_open,
+    }
+
+
+class AlreadyCheckedIn(Exception):
+    pass
+
+
+class NoActiveCheckIn(Exception):
+    pass
+
+
+class NoAttendanceRecord(NoActiveCheckIn):
+    pass
+
+
+class AttendanceManager(mongo_models.DjongoManager):
+    """
+    Check-in/check-out as single-document atomic MongoDB updates.
+
+    Both operations are guarded by the "open entry" condition inside the
+    update filter, so two concurrent requests can neither both check in nor
+    overwrite each other's entries. The same updates maintain the day summary
+    (first_in, last_out, worked_seconds, is_open) so reads never have to walk
+    the entries.
+    """
+
+    def check_in(self, employee_id, now, entry):
+        """
+        Push `entry` onto today's document, creating the document if needed.
+
+        One upsert: the filter only matches a document without an open entry.
+        If today's document exists but has one, the upsert collides with the
+        unique (employee, date) index and AlreadyCheckedIn is raised.
+        """
+        try:
+            self.mongo_update_one(
+                {
+                    'employee_id': employee_id,
+                    'date': _mongo_date(now.date()),
+                    'entries': {'$not': {'$elemMatch': {'check_out': None}}},
+                },
+                {
+                    '$push': {'entries': entry},
+                    '$set': {'is_open': True},
+                    '$min': {'first_in': now},
+                    '$setOnInsert': {'total_hours': 0.0, 'worked_seconds': 0.0, 'last_out': None},
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            raise AlreadyCheckedIn()
+
+    def check_out(self, employee_id, now, fields):
+        """
+        Close the open entry of today's document and add its duration to
+        total_hours.
+
+        Reads only the entry timestamps, then closes the entry and bumps
+        total_hours in one update guarded by "this entry is still open", so a
+        concurrent check-out cannot close it twice or lose an entry.
+
+        Returns:
+            The new total_hours
+        """
+        doc = self.mongo_find_one(
+            {'employee_id': employee_id, 'date': _mongo_date(now.date())},
+            projection={'entries.check_in': True, 'entries.check_out': True, 'total_hours': True},
+        )
+        if doc is None:
+            raise NoAttendanceRecord()
+
+        index = next((i for i, e in enumerate(doc.get('entries', [])) if e.get('check_out') is None), None)
+        if index is None:
+            raise NoActiveCheckIn()
+
+        check_in = _as_aware(doc['entries'][index].get('check_in'))
+        worked_seconds = (now - check_in).total_seconds() if check_in else 0.0
+        worked_hours = worked_seconds / 3600
+
+        updates = {f'entries.{index}.check_out': now, 'is_open': False, 'last_out': now}
+        updates.update({f'entries.{index}.{key}': value for key, value in fields.items()})
+        result = self.mongo_update_one(
+            {'_id': doc['_id'], f'entries.{index}.check_out': None},
+            {'$set': updates, '$inc': {'total_hours': worked_hours, 'worked_seconds': worked_seconds}},
+        )
+        if result.modified_count == 0:
+            # Closed by a concurrent request in the meantime
+            raise NoActiveCheckIn()
+
+        return doc.get('total_hours', 0.0) + worked_hours
+
 
 class Attendance(models.Model):
     _id = mongo_models.ObjectIdField(primary_key=True)
@@ -12,30 +152,31 @@ class Attendance(models.Model):
     date = models.DateField(default=timezone.now)
     entries = mongo_models.JSONField(default=list)
     total_hours = models.FloatField(default=0.0)
+
+    # Day summary, maintained by AttendanceManager.check_in/check_out
+    first_in = models.DateTimeField(null=True, blank=True)
+    last_out = models.DateTimeField(null=True, blank=True)
+    worked_seconds = models.FloatField(default=0.0)
+    is_open = models.BooleanField(default=False)
+
+    objects = AttendanceManager()
     
     class Meta:
         unique_together = ('employee', 'date')
 
     def calculate_total_hours(self):
-        from dateutil import parser
-        from django.utils import timezone
-        total_seconds = 0
-        for entry in self.entries:
-            if isinstance(entry, dict):
-                ci = entry.get('check_in')
-                co = entry.get('check_out')
-                
-                if isinstance(ci, str): ci = parser.isoparse(ci)
-                if isinstance(co, str): co = parser.isoparse(co)
-                
-                if ci and co:
-                    # Ensure both are aware for comparison
-                    if timezone.is_naive(ci): ci = timezone.make_aware(ci)
-                    if timezone.is_naive(co): co = timezone.make_aware(co)
-                    total_seconds += (co - ci).total_seconds()
-        self.total_hours = round(total_seconds / 3600, 2)
+        self.refresh_summary()
         return self.total_hours
 
+    def refresh_summary(self):
+        """Recompute the day summary and total_hours from the entries."""
+        summary = summarize_entries(self.entries)
+        self.first_in = summary['first_in']
+        self.last_out = summary['last_out']
+        self.worked_seconds = summary['worked_seconds']
+        self.is_open = summary['is_open']
+        self.total_hours = round(self.worked_seconds / 3600, 2)
+
     def __str__(self):
         return f"{self.employee.email} - {self.date}"
 
@@ -65,6 +206,22 @@ class LeaveRequest(models.Model):
     applied_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = mongo_models.DjongoManager()
+
+    class Meta:
+        indexes = [
+            # Leave lists of everyone / a manager / an employee, newest first
+            models.Index(fields=['-applied_at', '-_id'], name='leave_applied'),
+            models.Index(fields=['manager', '-applied_at', '-_id'], name='leave_manager_applied'),
+            models.Index(fields=['employee', '-applied_at', '-_id'], name='leave_employee_applied'),
+            # Approved leaves overlapping a period (reports)
+            models.Index(fields=['status', 'end_date'], name='leave_status_end_date'),
+            # Leave calendar (who's out), by start date
+            models.Index(fields=['status', 'start_date', '_id'], name='leave_status_start'),
+            # Leave export, per employee by start date
+            models.Index(fields=['employee', 'start_date', '_id'], name='leave_employee_start'),
+        ]
+
     @property
     def id(self):
         return self._id
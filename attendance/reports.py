@@ -0,0 +1,257 @@
+"""
+Attendance Reports
+
+Range reports for manager/admin dashboards, computed with MongoDB
+aggregation pipelines on the attendance collection instead of one
+AttendanceListView call per day:
+
+- day:        one row per employee per day (the employee x day matrix)
+- employee:   one row per employee with totals for the range
+- department: one row per department per day
+
+Rows are returned as compact arrays under a shared `columns` header.
+Working days without an attendance record are reported as absent, unless
+the employee was on approved leave. Days after today, and before the
+employee's date_of_joining, are never absent.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from authentication.models import User
+from .models import Attendance, LeaveRequest, _mongo_date
+
+
+GROUP_BY_CHOICES = ('day', 'employee', 'department')
+
+# Longest range a single report may cover
+MAX_REPORT_DAYS = 92
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def report_scope(user):
+    """
+    Employees whose attendance `user` may see.
+
+    - Admins/HR: everyone
+    - Managers: themselves and their direct reports
+    - Employees: themselves
+    """
+    # is_active__in: Djongo can't translate a bare boolean condition
+    users = User.objects.filter(is_active__in=[True])
+    role = getattr(user, 'role', 'employee')
+    if role in ('admin', 'hr'):
+        return users
+    if role == 'manager':
+        return users.filter(Q(manager_id=user.pk) | Q(pk=user.pk))
+    return users.filter(pk=user.pk)
+
+
+def scoped_employee_ids(user):
+    """
+    Ids of the employees in report_scope(), or None when `user` may see
+    everyone (so callers can skip the filter altogether).
+    """
+    if getattr(user, 'role', 'employee') in ('admin', 'hr'):
+        return None
+    return list(report_scope(user).values_list('_id', flat=True))
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def _is_working_day(day):
+    return day.weekday() not in getattr(settings, 'ATTENDANCE_WEEKEND_DAYS', (5,))
+
+
+def _late_expression():
+    """True when the first check-in (local time) is after ATTENDANCE_LATE_AFTER."""
+    return {'$gt': [
+        {'$dateToString': {'format': '%H:%M', 'date': '$first_in', 'timezone': settings.TIME_ZONE}},
+        getattr(settings, 'ATTENDANCE_LATE_AFTER', '09:30'),
+    ]}
+
+
+def _date_string(field):
+    return {'$dateToString': {'format': '%Y-%m-%d', 'date': field}}
+
+
+def _leave_days(employee_ids, start, end):
+    """(employee_id, date) pairs covered by approved leave, from one query."""
+    leaves = LeaveRequest.objects.filter(
+        status='approved',
+        employee_id__in=employee_ids,
+        start_date__lte=end,
+        end_date__gte=start,
+    ).values_list('employee_id', 'start_date', 'end_date')
+
+    covered = set()
+    for employee_id, leave_start, leave_end in leaves:
+        for day in _days(max(leave_start, start), min(leave_end, end)):
+            covered.add((employee_id, day))
+    return covered
+
+
+# ============================================================================
+# REPORT BUILDERS
+# ============================================================================
+
+def build_report(user, start, end, group_by='day', department=None):
+    """
+    Build an attendance report for the employees visible to `user`.
+
+    Issues three queries whatever the size of the range: the employees in
+    scope, their approved leaves, and one aggregation on attendance.
+    """
+    employees = report_scope(user)
+    if department:
+        employees = employees.filter(department=department)
+    employees = list(employees.values_list('_id', 'department', 'date_of_joining'))
+    joined = {employee_id: joined_on for employee_id, _, joined_on in employees}
+    employees = {employee_id: employee_department for employee_id, employee_department, _ in employees}
+    employee_ids = list(employees)
+
+    match = {'$match': {
+        'employee_id': {'$in': employee_ids},
+        'date': {'$gte': _mongo_date(start), '$lte': _mongo_date(end)},
+    }}
+    leave_days = _leave_days(employee_ids, start, end)
+    today = timezone.localdate()
+
+    def expected(employee_id, day):
+        """Whether a missing record on `day` is an absence (leave aside)."""
+        joined_on = joined.get(employee_id)
+        return _is_working_day(day) and day <= today and (joined_on is None or day >= joined_on)
+
+    builder = {
+        'day': _daily_report,
+        'employee': _employee_report,
+        'department': _department_report,
+    }[group_by]
+    report = builder(match, employees, expected, leave_days, start, end)
+    report.update({'start': start.isoformat(), 'end': end.isoformat(), 'group_by': group_by})
+    return report
+
+
+def _daily_report(match, employees, expected, leave_days, start, end):
+    pipeline = [match, {'$project': {
+        '_id': 0,
+        'employee_id': 1,
+        'date': _date_string('$date'),
+        'total_hours': 1,
+        'late': _late_expression(),
+    }}]
+    present = {
+        (doc['employee_id'], doc['date']): doc
+        for doc in Attendance.objects.mongo_aggregate(pipeline)
+    }
+
+    rows = []
+    for employee_id in employees:
+        employee = str(employee_id)
+        for day in _days(start, end):
+            date = day.isoformat()
+            doc = present.get((employee_id, date))
+            if doc is not None:
+                rows.append([employee, date, round(doc.get('total_hours') or 0.0, 2), bool(doc.get('late')), False, False])
+            else:
+                on_leave = (employee_id, day) in leave_days
+                absent = not on_leave and expected(employee_id, day)
+                rows.append([employee, date, 0.0, False, absent, on_leave])
+
+    return {
+        'columns': ['employee', 'date', 'total_hours', 'late', 'absent', 'on_leave'],
+        'rows': rows,
+    }
+
+
+def _employee_report(match, employees, expected, leave_days, start, end):
+    pipeline = [match, {'$group': {
+        '_id': '$employee_id',
+        'total_hours': {'$sum': '$total_hours'},
+        'days_present': {'$sum': 1},
+        'days_late': {'$sum': {'$cond': [_late_expression(), 1, 0]}},
+        'dates': {'$addToSet': _date_string('$date')},
+    }}]
+    totals = {doc['_id']: doc for doc in Attendance.objects.mongo_aggregate(pipeline)}
+
+    rows = []
+    for employee_id in employees:
+        doc = totals.get(employee_id, {})
+        present_dates = set(doc.get('dates', ()))
+        on_leave = sum(1 for day in _days(start, end) if _is_working_day(day) and (employee_id, day) in leave_days)
+        absent = sum(
+            1 for day in _days(start, end)
+            if expected(employee_id, day)
+            and (employee_id, day) not in leave_days
+            and day.isoformat() not in present_dates
+        )
+        rows.append([
+            str(employee_id),
+            round(doc.get('total_hours', 0.0), 2),
+            doc.get('days_present', 0),
+            doc.get('days_late', 0),
+            absent,
+            on_leave,
+        ])
+
+    return {
+        'columns': ['employee', 'total_hours', 'days_present', 'days_late', 'days_absent', 'days_on_leave'],
+        'rows': rows,
+    }
+
+
+def _department_report(match, employees, expected, leave_days, start, end):
+    # Grouped per employee and day; `employees` already maps them to departments
+    pipeline = [match, {'$group': {
+        '_id': {'employee_id': '$employee_id', 'date': _date_string('$date')},
+        'total_hours': {'$sum': '$total_hours'},
+        'late': {'$max': _late_expression()},
+    }}]
+    present = {
+        (doc['_id']['employee_id'], doc['_id']['date']): doc
+        for doc in Attendance.objects.mongo_aggregate(pipeline)
+    }
+
+    members = {}
+    for employee_id, department in employees.items():
+        members.setdefault(department, []).append(employee_id)
+
+    rows = []
+    for department, employee_ids in sorted(members.items(), key=lambda item: item[0] or ''):
+        for day in _days(start, end):
+            date = day.isoformat()
+            row_present = row_late = row_absent = row_leave = 0
+            total_hours = 0.0
+            for employee_id in employee_ids:
+                doc = present.get((employee_id, date))
+                if doc is not None:
+                    row_present += 1
+                    row_late += bool(doc.get('late'))
+                    total_hours += doc.get('total_hours') or 0.0
+                elif (employee_id, day) in leave_days:
+                    row_leave += 1
+                elif expected(employee_id, day):
+                    row_absent += 1
+            rows.append([
+                department, date, len(employee_ids), row_present, row_late, row_absent, row_leave,
+                round(total_hours, 2),
+            ])
+
+    return {
+        'columns': ['department', 'date', 'headcount', 'present', 'late', 'absent', 'on_leave', 'total_hours'],
+        'rows': rows,
+    }
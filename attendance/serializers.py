@@ -1,9 +1,12 @@
+import datetime
+
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Attendance, LeaveRequest
 from tasks.serializers import TaskSerializer, MongoPrimaryKeyRelatedField
 from authentication.models import User
 
-from authentication.serializers import UserSerializer
+from authentication.serializers import UserSerializer, UserPrefetchListSerializer
 
 class AttendanceSerializer(serializers.ModelSerializer):
     employee_details = UserSerializer(source='employee', read_only=True)
@@ -14,20 +17,21 @@ class AttendanceSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Attendance
-        fields = ('id', 'employee', 'employee_details', 'date', 'entries', 'total_hours', 'total_duration_display')
+        fields = ('id', 'employee', 'employee_details', 'date', 'entries', 'total_hours', 'total_duration_display',
+                  'first_in', 'last_out', 'worked_seconds', 'is_open')
+        list_serializer_class = UserPrefetchListSerializer
+        user_fields = ('employee',)
 
     def get_entries(self, obj):
-        from django.utils import timezone
-        import pytz
         # Ensure datetimes are serialized to strings in local timezone
         serialized = []
         for entry in obj.entries:
             e = entry.copy() if isinstance(entry, dict) else {}
             for key, value in e.items():
-                if hasattr(value, 'isoformat'):
-                    # If naive, assume it's UTC (Django's default storage)
+                if isinstance(value, datetime.datetime):
+                    # If naive, it's UTC (how Mongo hands datetimes back)
                     if timezone.is_naive(value):
-                        value = pytz.UTC.localize(value)
+                        value = value.replace(tzinfo=datetime.timezone.utc)
                     # Convert to local timezone before serializing
                     local_time = timezone.localtime(value)
                     e[key] = local_time.isoformat()
@@ -43,6 +47,13 @@ class AttendanceSerializer(serializers.ModelSerializer):
             return f"{minutes}m"
         return "0m"
 
+class AttendanceSummarySerializer(AttendanceSerializer):
+    """Attendance day without its entries, answered from the stored summary."""
+    class Meta(AttendanceSerializer.Meta):
+        fields = ('id', 'employee', 'employee_details', 'date', 'total_hours', 'total_duration_display',
+                  'first_in', 'last_out', 'worked_seconds', 'is_open')
+
+
 class LeaveRequestSerializer(serializers.ModelSerializer):
     employee_details = UserSerializer(source='employee', read_only=True)
     manager_details = UserSerializer(source='manager', read_only=True)
@@ -58,3 +69,5 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
             'applied_at', 'updated_at'
         )
         read_only_fields = ('employee', 'manager', 'status', 'applied_at', 'updated_at')
+        list_serializer_class = UserPrefetchListSerializer
+        user_fields = ('employee', 'manager')
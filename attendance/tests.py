@@ -1,3 +1,59 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from bson import ObjectId
+from django.utils import timezone
+
+from core.testing import MongomockTestCase
+from .models import AlreadyCheckedIn, Attendance, NoActiveCheckIn, NoAttendanceRecord
+
+
+def entry(now):
+    return {'check_in': now, 'check_out': None, 'note_in': '', 'note_out': ''}
+
+
+class CheckInOutTests(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee_id = ObjectId()
+        self.morning = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def test_check_in_creates_the_day_document(self):
+        Attendance.objects.check_in(self.employee_id, self.morning, entry(self.morning))
+        doc = Attendance.objects.mongo_find_one({'employee_id': self.employee_id})
+        self.assertTrue(doc['is_open'])
+        self.assertEqual(len(doc['entries']), 1)
+        self.assertEqual(doc['worked_seconds'], 0.0)
+
+    def test_second_check_in_is_refused_while_open(self):
+        Attendance.objects.check_in(self.employee_id, self.morning, entry(self.morning))
+        with self.assertRaises(AlreadyCheckedIn):
+            Attendance.objects.check_in(self.employee_id, self.morning, entry(self.morning))
+        self.assertEqual(Attendance.objects.mongo_count({'employee_id': self.employee_id}), 1)
+
+    def test_check_out_closes_the_entry_and_adds_its_hours(self):
+        noon = self.morning + datetime.timedelta(hours=3)
+        Attendance.objects.check_in(self.employee_id, self.morning, entry(self.morning))
+        self.assertAlmostEqual(Attendance.objects.check_out(self.employee_id, noon, {'note_out': 'lunch'}), 3.0)
+
+        doc = Attendance.objects.mongo_find_one({'employee_id': self.employee_id})
+        self.assertFalse(doc['is_open'])
+        self.assertEqual(doc['entries'][0]['note_out'], 'lunch')
+        self.assertAlmostEqual(doc['worked_seconds'], 3 * 3600)
+        with self.assertRaises(NoActiveCheckIn):
+            Attendance.objects.check_out(self.employee_id, noon, {})
+
+    def test_entries_of_one_day_add_up(self):
+        afternoon = self.morning + datetime.timedelta(hours=4)
+        Attendance.objects.check_in(self.employee_id, self.morning, entry(self.morning))
+        Attendance.objects.check_out(self.employee_id, self.morning + datetime.timedelta(hours=2), {})
+        Attendance.objects.check_in(self.employee_id, afternoon, entry(afternoon))
+        total = Attendance.objects.check_out(self.employee_id, afternoon + datetime.timedelta(hours=1), {})
+        self.assertAlmostEqual(total, 3.0)
+
+        doc = Attendance.objects.mongo_find_one({'employee_id': self.employee_id})
+        self.assertEqual(len(doc['entries']), 2)
+        self.assertAlmostEqual(doc['total_hours'], 3.0)
+
+    def test_check_out_without_a_record(self):
+        with self.assertRaises(NoAttendanceRecord):
+            Attendance.objects.check_out(self.employee_id, self.morning, {})
@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
-    CheckInView, CheckOutView, AttendanceListView, AttendanceStatusView,
+    CheckInView, CheckOutView, AttendanceListView, AttendanceStatusView, AttendanceReportView,
+    AttendanceExportView, LeaveExportView,
     LeaveRequestCreateView, MyLeaveRequestListView, SubordinateLeaveRequestListView,
     LeaveApprovalView, WhosOnLeaveView
 )
@@ -10,6 +11,8 @@ urlpatterns = [
     path('checkin/', CheckInView.as_view(), name='checkin'),
     path('checkout/', CheckOutView.as_view(), name='checkout'),
     path('status/', AttendanceStatusView.as_view(), name='attendance-status'),
+    path('report/', AttendanceReportView.as_view(), name='attendance-report'),
+    path('export/', AttendanceExportView.as_view(), name='attendance-export'),
     
     # Leave Management
     path('leaves/request/', LeaveRequestCreateView.as_view(), name='leave-request'),
@@ -17,4 +20,5 @@ urlpatterns = [
     path('leaves/subordinate/', SubordinateLeaveRequestListView.as_view(), name='subordinate-leaves'),
     path('leaves/approve/<str:id>/', LeaveApprovalView.as_view(), name='approve-leave'),
     path('leaves/whos-out/', WhosOnLeaveView.as_view(), name='whos-out'),
+    path('leaves/export/', LeaveExportView.as_view(), name='leave-export'),
 ]
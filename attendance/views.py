@@ -1,8 +1,12 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.utils import timezone
-from .models import Attendance, LeaveRequest
-from .serializers import AttendanceSerializer, LeaveRequestSerializer
+from .models import Attendance, LeaveRequest, AlreadyCheckedIn, NoActiveCheckIn, NoAttendanceRecord
+from .serializers import AttendanceSerializer, AttendanceSummarySerializer, LeaveRequestSerializer
+from authentication.auth import ClaimsJWTAuthentication
+from .reports import build_report, scoped_employee_ids, GROUP_BY_CHOICES, MAX_REPORT_DAYS
+from .models import _mongo_date
+from core.exports import EXPORT_BATCH_SIZE, export_response, lookup_user, parse_export_params
 
 class CheckInView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -10,22 +14,6 @@ class CheckInView(generics.GenericAPIView):
     def post(self, request):
         user = request.user
         now = timezone.now()
-        today = now.date()
-        
-        # Get or create daily document manually to be more robust with Djongo
-        attendance = Attendance.objects.filter(employee_id=user.pk, date=today).first()
-        if not attendance:
-            # print(f"Creating new record for {user.email} on {today}")
-            attendance = Attendance.objects.create(
-                employee=user, 
-                date=today,
-                entries=[],
-                total_hours=0
-            )
-        
-        # Check for active entry (prevent double check-in)
-        if any(e.get('check_out') is None for e in attendance.entries):
-             return Response({"error": "Already checked in. Please check out first."}, status=status.HTTP_400_BAD_REQUEST)
 
         # Create new entry
         new_entry = {
@@ -40,11 +28,12 @@ class CheckInView(generics.GenericAPIView):
             'note_in': request.data.get('check_in_note', ''),
             'note_out': '',
         }
-        
-        entries = list(attendance.entries)
-        entries.append(new_entry)
-        attendance.entries = entries
-        attendance.save()
+
+        # Single atomic upsert; refuses to add a second open entry
+        try:
+            Attendance.objects.check_in(user.pk, now, new_entry)
+        except AlreadyCheckedIn:
+             return Response({"error": "Already checked in. Please check out first."}, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({"message": "Checked in successfully"}, status=status.HTTP_201_CREATED)
 
@@ -54,35 +43,36 @@ class CheckOutView(generics.GenericAPIView):
     def patch(self, request):
         user = request.user
         now = timezone.now()
-        today = now.date()
-        
-        attendance = Attendance.objects.filter(employee_id=user.pk, date=today).first()
-        if not attendance:
+
+        # Close the open entry in place with a guarded atomic update
+        try:
+            total_hours = Attendance.objects.check_out(user.pk, now, {
+                'lat_out': request.data.get('check_out_lat'),
+                'lng_out': request.data.get('check_out_lng'),
+                'location_out': request.data.get('location_out', 'Kathmandu'),
+                'note_out': request.data.get('check_out_note'),
+            })
+        except NoAttendanceRecord:
             return Response({"error": "No attendance record found for today."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Find active entry
-        active_entry = next((e for e in attendance.entries if e.get('check_out') is None), None)
-        if not active_entry:
+        except NoActiveCheckIn:
             return Response({"error": "No active check-in found."}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update entry
-        active_entry['check_out'] = now
-        active_entry['lat_out'] = request.data.get('check_out_lat')
-        active_entry['lng_out'] = request.data.get('check_out_lng')
-        active_entry['location_out'] = request.data.get('location_out', 'Kathmandu')
-        active_entry['note_out'] = request.data.get('check_out_note')
-        
-        # Force Djongo to detect change by creating a new list of dicts
-        attendance.entries = [e.copy() for e in attendance.entries]
-        attendance.calculate_total_hours()
-        attendance.save()
-        
-        return Response({"message": "Checked out successfully", "total_hours": attendance.total_hours})
+        return Response({"message": "Checked out successfully", "total_hours": round(total_hours, 2)})
+
+def wants_summary(request):
+    """?summary=true skips the per-entry data and answers from the day summary."""
+    return request.query_params.get('summary', '').lower() in ('1', 'true', 'yes')
+
 
 class AttendanceListView(generics.ListAPIView):
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated] 
 
+    def get_serializer_class(self):
+        if wants_summary(self.request):
+            return AttendanceSummarySerializer
+        return AttendanceSerializer
+
     def get_queryset(self):
         user = self.request.user
         date_str = self.request.query_params.get('date')
@@ -108,20 +98,88 @@ class AttendanceListView(generics.ListAPIView):
 class AttendanceStatusView(generics.RetrieveAPIView):
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Polled constantly; only needs request.user.pk
+    authentication_classes = [ClaimsJWTAuthentication]
 
     def get(self, request, *args, **kwargs):
         today = timezone.now().date()
         attendance = Attendance.objects.filter(employee_id=request.user.pk, date=today).first()
         
-        is_checked_in = False
-        if attendance:
-            is_checked_in = any(e.get('check_out') is None for e in attendance.entries)
-            
+        # Maintained on every check-in/out, no need to walk the entries
+        is_checked_in = bool(attendance and attendance.is_open)
+
+        serializer_class = AttendanceSummarySerializer if wants_summary(request) else AttendanceSerializer
         return Response({
             "is_checked_in": is_checked_in, 
-            "attendance": AttendanceSerializer(attendance).data if attendance else None
+            "attendance": serializer_class(attendance).data if attendance else None
         })
 
+class AttendanceReportView(generics.GenericAPIView):
+    """
+    Attendance report over a date range (see attendance/reports.py).
+
+    Query Parameters:
+        start (str): First day, YYYY-MM-DD (required)
+        end (str): Last day, YYYY-MM-DD (required)
+        group_by (str): 'day' (default), 'employee' or 'department'
+        department (str): Restrict to one department
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        from datetime import datetime
+        try:
+            start = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+            end = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response({"error": "start and end are required (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end < start:
+            return Response({"error": "end must not be before start."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days + 1 > MAX_REPORT_DAYS:
+            return Response({"error": f"Range cannot exceed {MAX_REPORT_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+
+        group_by = request.query_params.get('group_by', 'day')
+        if group_by not in GROUP_BY_CHOICES:
+            return Response({"error": f"group_by must be one of: {', '.join(GROUP_BY_CHOICES)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = build_report(request.user, start, end, group_by, request.query_params.get('department'))
+        return Response(report)
+
+class AttendanceExportView(generics.GenericAPIView):
+    """
+    Stream attendance days in a date range as CSV or NDJSON (see core/exports.py).
+
+    Query Parameters:
+        start, end (str): Date range, YYYY-MM-DD
+        output (str): 'csv' (default) or 'ndjson'
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    columns = ['employee_id', 'employee_email', 'employee_name', 'date',
+               'first_in', 'last_out', 'total_hours', 'is_open']
+
+    def get(self, request):
+        start, end, export_format = parse_export_params(request)
+
+        match = {'date': {'$gte': _mongo_date(start), '$lte': _mongo_date(end)}}
+        employee_ids = scoped_employee_ids(request.user)
+        if employee_ids is not None:
+            match['employee_id'] = {'$in': employee_ids}
+
+        pipeline = [
+            {'$match': match},
+            # Per employee, in (employee, date) index order: no blocking sort
+            {'$sort': {'employee_id': 1, 'date': 1}},
+            *lookup_user('employee_id', 'employee'),
+            {'$project': {
+                '_id': 0, 'employee_id': 1, 'employee_email': 1, 'employee_name': 1,
+                'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$date'}},
+                'first_in': 1, 'last_out': 1, 'total_hours': 1, 'is_open': 1,
+            }},
+        ]
+        documents = Attendance.objects.mongo_aggregate(pipeline, batchSize=EXPORT_BATCH_SIZE, allowDiskUse=True)
+        return export_response(documents, self.columns, f'attendance_{start}_{end}', export_format)
+
 class LeaveRequestCreateView(generics.CreateAPIView):
     serializer_class = LeaveRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -143,6 +201,7 @@ class LeaveRequestCreateView(generics.CreateAPIView):
 class MyLeaveRequestListView(generics.ListAPIView):
     serializer_class = LeaveRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-applied_at', '-_id')
 
     def get_queryset(self):
         return LeaveRequest.objects.filter(employee=self.request.user).order_by('-applied_at')
@@ -150,6 +209,7 @@ class MyLeaveRequestListView(generics.ListAPIView):
 class SubordinateLeaveRequestListView(generics.ListAPIView):
     serializer_class = LeaveRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-applied_at', '-_id')
 
     def get_queryset(self):
         # Only managers should see their subordinates' requests
@@ -192,9 +252,52 @@ class LeaveApprovalView(generics.UpdateAPIView):
         instance.save()
         return Response(LeaveRequestSerializer(instance).data)
 
+class LeaveExportView(generics.GenericAPIView):
+    """
+    Stream leave requests overlapping a date range as CSV or NDJSON.
+
+    Query Parameters:
+        start, end (str): Date range, YYYY-MM-DD
+        status (str): Leave status to export (default 'approved'), or 'all'
+        output (str): 'csv' (default) or 'ndjson'
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    columns = ['leave_id', 'employee_id', 'employee_email', 'employee_name', 'leave_type',
+               'status', 'start_date', 'end_date', 'applied_at']
+
+    def get(self, request):
+        start, end, export_format = parse_export_params(request)
+
+        match = {
+            'start_date': {'$lte': _mongo_date(end)},
+            'end_date': {'$gte': _mongo_date(start)},
+        }
+        status_filter = request.query_params.get('status', 'approved')
+        if status_filter != 'all':
+            match['status'] = status_filter
+        employee_ids = scoped_employee_ids(request.user)
+        if employee_ids is not None:
+            match['employee_id'] = {'$in': employee_ids}
+
+        pipeline = [
+            {'$match': match},
+            # Per employee, in (employee, start_date, _id) index order
+            {'$sort': {'employee_id': 1, 'start_date': 1, '_id': 1}},
+            *lookup_user('employee_id', 'employee'),
+            {'$project': {
+                '_id': 0, 'leave_id': '$_id', 'employee_id': 1, 'employee_email': 1, 'employee_name': 1,
+                'leave_type': 1, 'status': 1, 'applied_at': 1,
+                'start_date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$start_date'}},
+                'end_date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$end_date'}},
+            }},
+        ]
+        documents = LeaveRequest.objects.mongo_aggregate(pipeline, batchSize=EXPORT_BATCH_SIZE, allowDiskUse=True)
+        return export_response(documents, self.columns, f'leaves_{start}_{end}', export_format)
+
 class WhosOnLeaveView(generics.ListAPIView):
     serializer_class = LeaveRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('start_date', '_id')
 
     def get_queryset(self):
         # Return all approved leaves from the last 3 months onwards for the calendar
@@ -1,11 +1,33 @@
+import logging
+
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
 from bson import ObjectId
+from django.utils.functional import cached_property
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.exceptions import AuthenticationFailed
 
+from .cache import user_cache
+
+logger = logging.getLogger(__name__)
+
 class MongoJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         user_id = validated_token['user_id']
+
+        # Serve from the user cache when possible; inactive users are still
+        # rejected below because the cached row carries is_active.
+        user = user_cache.get(self.user_model, user_id)
+        if user is None:
+            user = self.load_user(user_id)
+            user_cache.set(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        return user
+
+    def load_user(self, user_id):
         try:
             # Convert string ID to ObjectId for MongoDB lookup
             if isinstance(user_id, str) and len(user_id) == 24:
@@ -13,17 +35,85 @@ class MongoJWTAuthentication(JWTAuthentication):
                     user_id = ObjectId(user_id)
                 except:
                     pass
-            
+
             # Simple lookup using the primary key field (which is _id in our case)
-            user = self.user_model.objects.get(**{self.user_model._meta.pk.name: user_id})
-            
-            if not user.is_active:
-                raise AuthenticationFailed('User is inactive', code='user_inactive')
-                
-            return user
+            return self.user_model.objects.get(**{self.user_model._meta.pk.name: user_id})
         except self.user_model.DoesNotExist:
             raise AuthenticationFailed('User not found', code='user_not_found')
         except Exception as e:
-            # Fallback for other errors to help debug
-            print(f"Auth lookup error: {str(e)}")
+            logger.exception("Auth lookup error for user %s", user_id)
             raise AuthenticationFailed(f'Auth error: {str(e)}', code='auth_error')
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from access-token claims, without touching the DB.
+
+    Exposes the attributes our read-only views need (pk/_id, role, manager_id,
+    is_active). Use `<field>_id=request.user.pk` in queries instead of passing
+    the user object itself, since this is not a model instance.
+    """
+
+    @cached_property
+    def _id(self):
+        return ObjectId(self.token['user_id'])
+
+    @cached_property
+    def id(self):
+        return self._id
+
+    @cached_property
+    def pk(self):
+        return self._id
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', 'employee')
+
+    @cached_property
+    def manager_id(self):
+        manager_id = self.token.get('manager_id')
+        return ObjectId(manager_id) if manager_id else None
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+
+class ClaimsJWTAuthentication(MongoJWTAuthentication):
+    """
+    Opt-in "claims-only" authentication for read-only endpoints.
+
+    Views declare `authentication_classes = [ClaimsJWTAuthentication]` when a
+    ClaimsUser is enough. Tokens issued before the claims were added fall back
+    to the regular (cached) DB lookup. Claims are re-read from the DB whenever
+    the access token is refreshed, so they are at most ACCESS_TOKEN_LIFETIME old.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+
+class QueryTokenJWTAuthentication(MongoJWTAuthentication):
+    """
+    MongoJWTAuthentication that also accepts the access token as ?token=.
+
+    For EventSource clients, which cannot set an Authorization header. Query
+    strings end up in access logs, so only use it on read-only endpoints.
+    Users come from the (cached) DB lookup rather than the token's claims:
+    the realtime endpoints push content for as long as the token lives, and
+    a deactivated user must stop receiving it within the user cache TIMEOUT.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get('token')
+        if not raw_token:
+            return super().authenticate(request)
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_user(validated_token), validated_token
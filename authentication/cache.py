@@ -0,0 +1,197 @@
+"""
+User Cache Module
+
+Caches the User rows resolved by MongoJWTAuthentication so that authenticated
+requests don't pay a MongoDB round trip before any view code runs.
+
+Backends are selected with the USER_CACHE setting:
+- 'local':  in-process LRU with a per-entry TTL (default)
+- 'django': Django's cache framework (shared between workers when CACHES
+            points at a shared backend)
+- 'none':   caching disabled
+
+Entries are invalidated from the post_save/post_delete signals on User, and
+every entry expires after TIMEOUT seconds, which bounds how long a change made
+outside the ORM (e.g. QuerySet.update) can go unnoticed.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'local',
+    'TIMEOUT': 60,
+    'MAX_ENTRIES': 2048,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'auth-user',
+}
+
+
+# ============================================================================
+# SERIALIZATION HELPERS
+# ============================================================================
+
+def _dump(user):
+    """Snapshot the concrete field values of a user."""
+    return tuple(getattr(user, f.attname) for f in user._meta.concrete_fields)
+
+
+def _load(model, values):
+    """
+    Rebuild a user from a snapshot.
+
+    A fresh instance is built on every hit so requests never share (and
+    mutate) the same object, and no related objects are carried over.
+    """
+    field_names = [f.attname for f in model._meta.concrete_fields]
+    return model.from_db('default', field_names, list(values))
+
+
+# ============================================================================
+# CACHE BACKENDS
+# ============================================================================
+
+class LocalUserCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, timeout, max_entries):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return values
+
+    def set(self, key, values):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoUserCache:
+    """Cache backed by one of the aliases configured in CACHES."""
+
+    def __init__(self, timeout, alias, key_prefix):
+        self.timeout = timeout
+        self.alias = alias
+        self.key_prefix = key_prefix
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _key(self, key):
+        return f'{self.key_prefix}:{key}'
+
+    def get(self, key):
+        return self._cache.get(self._key(key))
+
+    def set(self, key, values):
+        self._cache.set(self._key(key), values, self.timeout)
+
+    def delete(self, key):
+        self._cache.delete(self._key(key))
+
+    def clear(self):
+        # Entries expire on their own; clearing the whole shared cache
+        # would throw away unrelated data.
+        pass
+
+
+class NullUserCache:
+    """Backend used when caching is disabled."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, values):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+class UserCache:
+    """
+    Front for the configured backend.
+
+    Keys are the string form of the user's ObjectId, so lookups work the same
+    whether the caller holds a str (token claim) or an ObjectId (signal).
+    """
+
+    def __init__(self):
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self._build_backend()
+        return self._backend
+
+    def _build_backend(self):
+        config = {**DEFAULT_SETTINGS, **getattr(settings, 'USER_CACHE', {})}
+        backend = config['BACKEND']
+        if backend == 'local':
+            return LocalUserCache(config['TIMEOUT'], config['MAX_ENTRIES'])
+        if backend == 'django':
+            return DjangoUserCache(config['TIMEOUT'], config['CACHE_ALIAS'], config['KEY_PREFIX'])
+        if backend in (None, 'none'):
+            return NullUserCache()
+        raise ValueError(f"Unknown USER_CACHE backend: {backend}")
+
+    def get(self, model, user_id):
+        values = self.backend.get(str(user_id))
+        if values is None:
+            return None
+        return _load(model, values)
+
+    def set(self, user):
+        self.backend.set(str(user.pk), _dump(user))
+
+    def invalidate(self, user_id):
+        self.backend.delete(str(user_id))
+
+    def clear(self):
+        self.backend.clear()
+
+    def reset(self):
+        """Drop the backend so it is rebuilt from current settings."""
+        self._backend = None
+
+
+user_cache = UserCache()
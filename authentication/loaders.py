@@ -0,0 +1,44 @@
+"""
+Batched loading of users for serializers that nest UserSerializer.
+
+UserSerializer renders `manager_details`, which dereferences `user.manager`.
+Serializing N users (directly, or through a `sender`/`employee` foreign key on
+N rows) would therefore cost up to 2N queries. prefetch_users() resolves the
+users and their managers for the whole list with one `$in` query each.
+"""
+
+from core.loaders import load_by_ids, prefetch_foreign_key
+from .models import User
+
+
+def prefetch_users(instances, *field_names):
+    """
+    Resolve User foreign keys `field_names` on `instances`, then the managers
+    of every user involved.
+
+    All fields share one `$in` query for the users and one for the managers.
+    """
+    instances = [obj for obj in instances if obj is not None]
+    if not instances:
+        return []
+
+    fields = [instances[0]._meta.get_field(name) for name in field_names]
+    pending_ids = {
+        getattr(obj, field.attname)
+        for field in fields
+        for obj in instances
+        if not field.is_cached(obj)
+    }
+    loaded = load_by_ids(User, pending_ids)
+
+    users = []
+    for field in fields:
+        for obj in instances:
+            if not field.is_cached(obj):
+                field.set_cached_value(obj, loaded.get(getattr(obj, field.attname)))
+            user = field.get_cached_value(obj)
+            if user is not None:
+                users.append(user)
+
+    prefetch_foreign_key(users, 'manager')
+    return users
@@ -2,7 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from djongo import models as mongo_models
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager, mongo_models.DjongoManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
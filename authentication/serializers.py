@@ -1,7 +1,46 @@
+from django.db import models
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import AccessToken
 from .models import User
+from .loaders import prefetch_users
+from core.loaders import prefetch_foreign_key
 from bson import ObjectId
 
+
+def add_user_claims(token, user):
+    """Stamp the claims read by ClaimsJWTAuthentication onto a token."""
+    token['role'] = user.role
+    token['manager_id'] = str(user.manager_id) if user.manager_id else None
+    token['is_active'] = user.is_active
+    return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer whose tokens carry role/manager_id/is_active claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that re-reads the user so the new access token never
+    carries claims older than its own lifetime, and inactive or deleted
+    users cannot mint new access tokens.
+    """
+
+    def validate(self, attrs):
+        from .auth import MongoJWTAuthentication
+
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = MongoJWTAuthentication().get_user(access)
+        data['access'] = str(add_user_claims(access, user))
+        return data
+
+
 class MongoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
     def to_internal_value(self, data):
         try:
@@ -18,6 +57,30 @@ class MongoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
             return str(value.pk)
         return str(value)
 
+class UserPrefetchListSerializer(serializers.ListSerializer):
+    """
+    List serializer that bulk-loads nested users before rendering.
+
+    The child serializer lists its User foreign keys in `Meta.user_fields`;
+    those users and their managers are loaded for the whole list with one
+    query each (see authentication/loaders.py). Subclasses can extend
+    prefetch() to load other relations the same way.
+    """
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        self.prefetch(items)
+        return super().to_representation(items)
+
+    def prefetch(self, items):
+        prefetch_users(items, *getattr(self.child.Meta, 'user_fields', ()))
+
+
+class UserListSerializer(UserPrefetchListSerializer):
+    """Loads the managers of all listed users with a single query."""
+    def prefetch(self, items):
+        prefetch_foreign_key(items, 'manager')
+
+
 class UserSerializer(serializers.ModelSerializer):
     id = serializers.CharField(source='_id', read_only=True)
     manager = MongoPrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
@@ -31,8 +94,11 @@ class UserSerializer(serializers.ModelSerializer):
             'password': {'write_only': True, 'required': False},
             'email': {'required': True}
         }
+        list_serializer_class = UserListSerializer
 
     def get_manager_details(self, obj):
+        # obj.manager is served from the relation cache when the user was
+        # loaded through prefetch_users()/UserListSerializer
         if obj.manager:
             return {
                 'id': str(obj.manager._id),
@@ -1,7 +1,8 @@
 import os
-from django.db.models.signals import pre_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from .models import User
+from .cache import user_cache
 
 @receiver(pre_save, sender=User)
 def delete_old_avatar_on_update(sender, instance, **kwargs):
@@ -22,3 +23,11 @@ def delete_avatar_on_delete(sender, instance, **kwargs):
     if instance.avatar:
         if os.path.isfile(instance.avatar.path):
             os.remove(instance.avatar.path)
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_on_save(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_on_delete(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
@@ -69,6 +69,7 @@ class EmployeeListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = '_id'
 
 
 class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -0,0 +1,334 @@
+"""
+REST API Benchmarks
+
+Seeds a synthetic data set into a throwaway database, then drives the hot
+API paths in-process through Django's test client and records, per
+scenario, latency percentiles and the number of MongoDB commands issued per
+request. Results are written as JSON so runs on different commits can be
+compared.
+
+Usage:
+    pip install mongomock                     # only for --backend mongomock
+    python -m benchmarks.run --backend mongomock --iterations 50 --output before.json
+    python -m benchmarks.run --backend mongod --users 200 --tasks 2000 --output after.json --compare before.json
+
+With --backend mongod the database is BENCH_MONGO_HOST / BENCH_DB_NAME (see
+benchmarks/settings.py); it is dropped and re-seeded on every run.
+mongomock numbers are only meaningful for query counts and relative
+changes, not absolute latency.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import pymongo
+from pymongo import monitoring
+
+
+SCENARIOS = (
+    'login', 'check_in', 'check_out', 'task_list', 'project_list',
+    'chat_list', 'notification_poll', 'notification_list',
+)
+
+# Collection methods counted as one round trip each on mongomock
+MONGOMOCK_COMMANDS = (
+    'find', 'find_one', 'aggregate', 'count_documents', 'estimated_document_count', 'distinct',
+    'insert_one', 'insert_many', 'update_one', 'update_many', 'replace_one',
+    'delete_one', 'delete_many', 'find_one_and_update', 'find_one_and_delete', 'bulk_write',
+)
+
+# Connection housekeeping, not queries
+IGNORED_COMMANDS = {'isMaster', 'ismaster', 'hello', 'ping', 'endSessions', 'buildInfo', 'saslStart', 'saslContinue'}
+
+
+# ============================================================================
+# QUERY COUNTING
+# ============================================================================
+
+class QueryCounter(monitoring.CommandListener):
+    """
+    Counts MongoDB commands: through pymongo command monitoring against a
+    real server, by wrapping collection methods on mongomock.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._depth = 0
+
+    def reset(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def patch_mongomock(self):
+        from mongomock.collection import Collection
+
+        for name in MONGOMOCK_COMMANDS:
+            setattr(Collection, name, self._counted(getattr(Collection, name)))
+
+    def _counted(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            # mongomock calls its own public methods internally; count the outer call only
+            if self._depth == 0:
+                self.count += 1
+            self._depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+        return wrapper
+
+
+def setup_backend(backend, counter):
+    """Install the query counter (and mongomock) before Django connects."""
+    if backend == 'mongomock':
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit('mongomock is not installed: pip install mongomock')
+        pymongo.MongoClient = mongomock.MongoClient
+        counter.patch_mongomock()
+    else:
+        monitoring.register(counter)
+
+
+# ============================================================================
+# SCENARIOS
+# ============================================================================
+
+class Scenarios:
+    """One method per scenario; each performs a single API request."""
+
+    def __init__(self, client, dataset):
+        self.client = client
+        self.dataset = dataset
+        self.employees = dataset['employees']
+        self._tokens = {}
+
+    def token(self, email):
+        if email not in self._tokens:
+            response = self._login(email)
+            if response.status_code != 200:
+                raise RuntimeError(f'Login failed for {email}: {response.status_code} {response.content[:200]}')
+            self._tokens[email] = response.json()['access']
+        return self._tokens[email]
+
+    def _auth(self, email):
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.token(email)}'}
+
+    def _login(self, email):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': self.dataset['password']},
+                                content_type='application/json')
+
+    def _employee(self, i):
+        return self.employees[i % len(self.employees)]
+
+    def login(self, i):
+        return self._login(self._employee(i))
+
+    def check_in(self, i):
+        return self.client.post('/api/attendance/checkin/', {'location_in': 'Bench'},
+                                content_type='application/json', **self._auth(self._employee(i)))
+
+    def check_out(self, i):
+        return self.client.patch('/api/attendance/checkout/', {'location_out': 'Bench'},
+                                 content_type='application/json', **self._auth(self._employee(i)))
+
+    def task_list(self, i):
+        return self.client.get('/api/tasks/', **self._auth(self.dataset['admin']))
+
+    def project_list(self, i):
+        return self.client.get('/api/projects/projects/', **self._auth(self.dataset['manager']))
+
+    def chat_list(self, i):
+        project_ids = self.dataset['project_ids']
+        project_id = project_ids[i % len(project_ids)]
+        member = self.dataset['member_emails'][project_id][0]
+        return self.client.get('/api/chat/messages/', {'project': project_id}, **self._auth(member))
+
+    def notification_poll(self, i):
+        return self.client.get('/api/notifications/unread_count/', **self._auth(self._employee(i)))
+
+    def notification_list(self, i):
+        return self.client.get('/api/notifications/', **self._auth(self._employee(i)))
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies, queries, errors):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'min': round(min(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(max(latencies), 3),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+def run_scenarios(scenarios, names, counter, iterations, warmup):
+    """
+    Run every scenario once per round, in order, so paired scenarios
+    (check_in then check_out) always see a consistent state.
+    """
+    # Log everyone in up front so token fetching is not measured
+    for i in range(len(scenarios.employees)):
+        scenarios.token(scenarios._employee(i))
+
+    samples = {name: ([], [], 0) for name in names}
+    for i in range(warmup + iterations):
+        for name in names:
+            counter.reset()
+            start = time.perf_counter()
+            response = getattr(scenarios, name)(i)
+            elapsed = (time.perf_counter() - start) * 1000
+            if i < warmup:
+                continue
+            latencies, queries, errors = samples[name]
+            latencies.append(elapsed)
+            queries.append(counter.count)
+            samples[name] = (latencies, queries, errors + (response.status_code >= 400))
+
+    return {name: summarize(*samples[name]) for name in names}
+
+
+def compare(results, baseline):
+    """Print p50/p95/query deltas against a previous result file."""
+    print(f"\n{'scenario':<20}{'p50 ms':>28}{'p95 ms':>28}{'queries':>24}")
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+
+        def delta(path):
+            old = previous[path[0]][path[1]]
+            new = current[path[0]][path[1]]
+            change = f'{(new - old) / old * 100:+.0f}%' if old else 'n/a'
+            return f'{old:g}->{new:g} ({change})'
+
+        print(f"{name:<20}{delta(('latency_ms', 'p50')):>28}{delta(('latency_ms', 'p95')):>28}"
+              f"{delta(('queries', 'mean')):>24}")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the REST API hot paths.')
+    parser.add_argument('--backend', choices=('mongomock', 'mongod'), default='mongomock')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--projects', type=int)
+    parser.add_argument('--tasks', type=int)
+    parser.add_argument('--messages', type=int)
+    parser.add_argument('--attendance-days', type=int)
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='Previous result file to compare against')
+    args = parser.parse_args(argv)
+
+    counter = QueryCounter()
+    setup_backend(args.backend, counter)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+
+    from django.test import Client
+    from .seed import seed
+
+    sizes = {
+        key: value for key, value in {
+            'users': args.users,
+            'projects': args.projects,
+            'tasks': args.tasks,
+            'messages': args.messages,
+            'attendance_days': args.attendance_days,
+        }.items() if value is not None
+    }
+    started = time.perf_counter()
+    dataset = seed(sizes, random_seed=args.seed)
+    seed_seconds = time.perf_counter() - started
+
+    names = args.scenario or list(SCENARIOS)
+    scenarios = Scenarios(Client(), dataset)
+    results = {
+        'meta': {
+            'backend': args.backend,
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'sizes': dataset['sizes'],
+            'seed_seconds': round(seed_seconds, 3),
+        },
+        'scenarios': run_scenarios(scenarios, names, counter, args.iterations, args.warmup),
+    }
+
+    with open(args.output, 'w') as handle:
+        json.dump(results, handle, indent=2)
+
+    print(f"{'scenario':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'errors':>8}")
+    for name, result in results['scenarios'].items():
+        latency = result['latency_ms']
+        print(f"{name:<20}{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}"
+              f"{result['queries']['mean']:>10}{result['errors']:>8}")
+    print(f'\nResults written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(results, json.load(handle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Synthetic Data for Benchmarks
+
+Writes a deterministic data set (users with managers, projects with members,
+tasks, chat messages, notifications and past attendance days) straight into
+the benchmark database with insert_many (core/documents.py), so they are
+stored exactly as the ORM would store them without paying for N ORM saves
+and the signals they fire.
+"""
+
+import datetime
+import random
+
+from bson import ObjectId
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from attendance.models import Attendance
+from authentication.models import User
+from chat.models import Message
+from core.documents import collection_for, insert_instances
+from core.indexes import model_indexes
+from notifications.counters import reconcile_unread_counters
+from notifications.models import Notification
+from projects.counters import rebuild_task_counters
+from projects.models import Project, ProjectMember
+from tasks.models import Task
+
+
+BENCH_PASSWORD = 'bench-pass-123'
+
+DEFAULT_SIZES = {
+    'users': 50,
+    'projects': 10,
+    'members_per_project': 8,
+    'tasks': 200,
+    'messages': 500,
+    'notifications_per_user': 20,
+    'attendance_days': 20,
+}
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def reset_database(db):
+    """Drop every collection of the benchmark database."""
+    if 'bench' not in db.name:
+        raise RuntimeError(f"Refusing to reset database '{db.name}': benchmark database names must contain 'bench'.")
+    for name in db.list_collection_names():
+        db.drop_collection(name)
+
+
+def create_indexes(db):
+    """Create the indexes the models declare (see core/indexes.py)."""
+    for model in apps.get_models(include_auto_created=True):
+        indexes = model_indexes(model)
+        if indexes:
+            db[model._meta.db_table].create_indexes(indexes)
+
+
+# ============================================================================
+# SEEDING
+# ============================================================================
+
+def seed(sizes=None, random_seed=0):
+    """
+    Reset the benchmark database and fill it with synthetic data.
+
+    Returns:
+        dict with the credentials and ids the scenarios need
+    """
+    sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+    rng = random.Random(random_seed)
+    db = collection_for(User).database
+    reset_database(db)
+    create_indexes(db)
+
+    now = timezone.now()
+    password = make_password(BENCH_PASSWORD)
+
+    # Users: one admin, one HR, ~10% managers, the rest report to a manager
+    def make_user(index, role, manager=None):
+        return User(
+            _id=ObjectId(), email=f'{role}{index}@bench.local', username=f'{role}{index}@bench.local',
+            password=password, first_name=role.title(), last_name=str(index), role=role,
+            department=f'Dept {index % 5}', manager=manager, is_active=True, date_joined=now,
+        )
+
+    admin = make_user(0, 'admin')
+    hr = make_user(0, 'hr')
+    managers = [make_user(i, 'manager') for i in range(max(1, sizes['users'] // 10))]
+    employees = [
+        make_user(i, 'employee', managers[i % len(managers)])
+        for i in range(max(1, sizes['users'] - len(managers) - 2))
+    ]
+    users = [admin, hr] + managers + employees
+    insert_instances(User, users)
+
+    # Projects with accepted members
+    projects, memberships = [], []
+    project_members = {}
+    for i in range(sizes['projects']):
+        owner = managers[i % len(managers)]
+        project = Project(_id=ObjectId(), name=f'Project {i}', company_name='Bench Co', created_by=owner,
+                          created_at=now, updated_at=now)
+        projects.append(project)
+        members = [owner] + rng.sample(employees, min(sizes['members_per_project'], len(employees)))
+        project_members[project.pk] = members
+        memberships.extend(
+            ProjectMember(_id=ObjectId(), project=project, user=user, status='accepted',
+                          role='owner' if user is owner else 'member', invited_by=owner, joined_at=now)
+            for user in members
+        )
+    insert_instances(Project, projects)
+    insert_instances(ProjectMember, memberships)
+
+    # Tasks spread over the projects, each assigned to 1-3 project members
+    tasks, links = [], []
+    task_members = {}
+    through = Task.assigned_members.through
+    for i in range(sizes['tasks']):
+        project = projects[i % len(projects)] if projects else None
+        candidates = project_members[project.pk] if project else employees
+        task = Task(_id=ObjectId(), title=f'Task {i}', description='Synthetic benchmark task', project=project,
+                    deadline=now + datetime.timedelta(days=rng.randint(-10, 30)),
+                    status=rng.choice(['pending', 'in_progress', 'completed']), created_at=now)
+        tasks.append(task)
+        task_members[task.pk] = rng.sample(candidates, min(rng.randint(1, 3), len(candidates)))
+        for user in task_members[task.pk]:
+            links.append(through(id=len(links) + 1, task_id=task.pk, user_id=user.pk))
+    insert_instances(Task, tasks)
+    insert_instances(through, links)
+    rebuild_task_counters()
+
+    # Chat messages, oldest first: every fourth one goes to the task chat of
+    # one of the first few tasks, the rest to project group chats
+    messages = []
+    task_channels = tasks[:len(projects)]
+    for i in range(sizes['messages'] if projects else 0):
+        task = task_channels[i // 4 % len(task_channels)] if task_channels and i % 4 == 3 else None
+        project = task.project if task else projects[i % len(projects)]
+        senders = task_members[task.pk] if task else project_members[project.pk]
+        messages.append(Message(
+            _id=ObjectId(), sender=rng.choice(senders), content=f'Message {i}',
+            project=project, task=task, timestamp=now - datetime.timedelta(minutes=sizes['messages'] - i),
+        ))
+    insert_instances(Message, messages)
+
+    # Notifications, roughly half unread
+    notifications = [
+        Notification(_id=ObjectId(), recipient=user, sender=admin, notification_type='announcement',
+                     title=f'Notice {i}', message='Synthetic benchmark notification',
+                     is_read=rng.random() < 0.5, created_at=now - datetime.timedelta(hours=i))
+        for user in users
+        for i in range(sizes['notifications_per_user'])
+    ]
+    insert_instances(Notification, notifications)
+    reconcile_unread_counters()
+
+    # Closed attendance days before today, so today's check-in starts fresh
+    attendance = []
+    for user in users:
+        for offset in range(1, sizes['attendance_days'] + 1):
+            day = (now - datetime.timedelta(days=offset)).date()
+            check_in = datetime.datetime.combine(day, datetime.time(3, rng.randint(0, 59)), datetime.timezone.utc)
+            check_out = check_in + datetime.timedelta(hours=8, minutes=rng.randint(0, 59))
+            record = Attendance(_id=ObjectId(), employee=user, date=day, entries=[{
+                'check_in': check_in, 'check_out': check_out,
+                'lat_in': 0.0, 'lng_in': 0.0, 'lat_out': 0.0, 'lng_out': 0.0,
+                'location_in': 'Bench', 'location_out': 'Bench', 'note_in': '', 'note_out': '',
+            }])
+            record.refresh_summary()
+            attendance.append(record)
+    insert_instances(Attendance, attendance)
+
+    return {
+        'sizes': sizes,
+        'password': BENCH_PASSWORD,
+        'admin': admin.email,
+        'manager': managers[0].email,
+        'employees': [user.email for user in employees],
+        'project_ids': [str(project.pk) for project in projects],
+        'member_emails': {str(pk): [user.email for user in members] for pk, members in project_members.items()},
+        'task_channels': {str(task.pk): [user.email for user in task_members[task.pk]] for task in task_channels},
+    }
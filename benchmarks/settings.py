@@ -0,0 +1,43 @@
+"""
+Benchmark Settings
+
+Production settings pointed at a throwaway local database. The MongoDB
+server is BENCH_MONGO_HOST (default: a local mongod); `python -m
+benchmarks.run --backend mongomock` swaps the client for mongomock before
+Django starts, in which case the host is never contacted.
+"""
+
+import os
+
+from core.settings import *  # noqa: F401,F403
+
+# ============================================================================
+# DATABASE CONFIGURATION
+# ============================================================================
+DATABASES = {
+    'default': {
+        'ENGINE': 'djongo',
+        'NAME': os.getenv('BENCH_DB_NAME', 'hr_system_bench'),
+        'ENFORCE_SCHEMA': False,
+        'CLIENT': {
+            'host': os.getenv('BENCH_MONGO_HOST', 'mongodb://localhost:27017/'),
+            'serverSelectionTimeoutMS': 5000,
+        }
+    }
+}
+
+# ============================================================================
+# REQUEST HANDLING
+# ============================================================================
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'root': {'level': 'ERROR'},
+}
+
+# Single process: realtime events never need to leave it (mongomock has no
+# capped collections either)
+EVENTS = dict(EVENTS, BROKER='local')  # noqa: F405
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_message_channel_timestamp'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_channel_timestamp',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['project', 'task', 'timestamp', '_id'], name='message_channel_position'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['task', 'timestamp', '_id'], name='message_task_position'),
+        ),
+    ]
@@ -20,6 +20,12 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Channel history and incremental sync (?after= / ?since=), in
+            # (timestamp, _id) order; task channels are looked up by task alone
+            models.Index(fields=['project', 'task', 'timestamp', '_id'], name='message_channel_position'),
+            models.Index(fields=['task', 'timestamp', '_id'], name='message_task_position'),
+        ]
 
     def __str__(self):
         # Use email if available, otherwise just 'User'
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Message
-from authentication.serializers import UserSerializer
+from authentication.serializers import UserSerializer, UserPrefetchListSerializer
 from authentication.models import User
 from projects.models import Project
 from tasks.models import Task
@@ -38,6 +38,8 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = ['id', 'sender', 'sender_details', 'sender_email', 'sender_name', 'content', 'timestamp', 'project', 'task']
         read_only_fields = ['id', 'sender', 'timestamp']
+        list_serializer_class = UserPrefetchListSerializer
+        user_fields = ('sender',)
 
     def get_sender_name(self, obj):
         if obj.sender:
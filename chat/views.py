@@ -2,14 +2,86 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from .models import Message
 from .serializers import MessageSerializer
-from projects.models import Project, ProjectMember
+from projects.visibility import visible_project_ids
 from tasks.models import Task
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from rest_framework.settings import api_settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Newest first: the first page holds the latest messages and `next`
+    # walks back through the history. Sync mode (?after=/?since=) reads forward.
+    cursor_ordering = ('-timestamp', '-_id')
+
+    def can_chat_in_project(self, project_id):
+        """Admins, the project's creator and accepted members may chat in a project."""
+        if not hasattr(self, '_chat_project_ids'):
+            self._chat_project_ids = visible_project_ids(self.request.user, member_statuses=('accepted',))
+        return self._chat_project_ids is None or project_id in self._chat_project_ids
+
+    def list(self, request, *args, **kwargs):
+        """
+        List messages, or only the new ones when polling in sync mode.
+
+        Query Parameters:
+            project (str): Project group chat
+            task (str): Task chat
+            after (str): Sync mode: messages newer than this message id
+            since (str): Sync mode: messages newer than this ISO timestamp
+            page_size (int): Sync mode: maximum messages returned
+
+        Returns:
+            Paginated messages, or in sync mode
+            {"results": [...], "after": <id of the newest message returned
+            (or the given one)>, "has_more": bool}
+        """
+        after = request.query_params.get('after')
+        since = request.query_params.get('since')
+        if not (after or since):
+            return super().list(request, *args, **kwargs)
+        return self.sync(request, after, since)
+
+    def sync(self, request, after, since):
+        # Served by the channel indexes: only rows newer than the client's
+        # position are read and serialized.
+        if after:
+            try:
+                anchor = Message.objects.filter(pk=ObjectId(after)).values_list('timestamp', flat=True).first()
+            except (InvalidId, TypeError):
+                raise ValidationError({'error': 'after must be a message id.'})
+            if anchor is None:
+                raise ValidationError({'error': 'Unknown message id in after.'})
+            # The outer bound lets the index scan start at the anchor
+            newer = Q(timestamp__gte=anchor) & (Q(timestamp__gt=anchor) | Q(timestamp=anchor, _id__gt=ObjectId(after)))
+        else:
+            anchor = parse_datetime(since)
+            if anchor is None:
+                raise ValidationError({'error': 'since must be an ISO 8601 timestamp.'})
+            if timezone.is_naive(anchor):
+                anchor = timezone.make_aware(anchor, timezone.utc)
+            newer = Q(timestamp__gt=anchor)
+
+        try:
+            limit = int(request.query_params.get('page_size', api_settings.PAGE_SIZE))
+        except ValueError:
+            limit = api_settings.PAGE_SIZE
+        limit = max(1, min(limit, getattr(settings, 'MAX_PAGE_SIZE', 200)))
+
+        messages = list(self.get_queryset().filter(newer).order_by('timestamp', '_id')[:limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not messages:
+            return Response({'results': [], 'after': after, 'has_more': False})
+
+        serializer = self.get_serializer(messages, many=True)
+        return Response({'results': serializer.data, 'after': str(messages[-1].pk), 'has_more': has_more})
 
     def get_queryset(self):
         user = self.request.user
@@ -21,7 +93,7 @@ class MessageViewSet(viewsets.ModelViewSet):
                 task_id = ObjectId(task_param) if isinstance(task_param, str) and len(task_param) == 24 else task_param
                 task = Task.objects.get(_id=task_id)
                 
-                is_assigned = task.assigned_members.filter(_id=user._id).exists()
+                is_assigned = task.is_assigned(user)
                 is_admin = user.role == 'admin'
                 is_project_creator = task.project and task.project.created_by == user
 
@@ -36,12 +108,7 @@ class MessageViewSet(viewsets.ModelViewSet):
             try:
                 project_id = ObjectId(project_param) if isinstance(project_param, str) and len(project_param) == 24 else project_param
                 
-                # Check membership
-                is_member = ProjectMember.objects.filter(project_id=project_id, user=user, status='accepted').exists()
-                is_admin = user.role == 'admin'
-                is_creator = Project.objects.filter(_id=project_id, created_by=user).exists()
-
-                if not (is_member or is_admin or is_creator):
+                if not self.can_chat_in_project(project_id):
                     return Message.objects.none()
                 
                 # Return only group messages (where task is null)
@@ -57,7 +124,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         task = serializer.validated_data.get('task')
 
         if task:
-            is_assigned = task.assigned_members.filter(_id=user._id).exists()
+            is_assigned = task.is_assigned(user)
             is_admin = user.role == 'admin'
             is_project_creator = task.project and task.project.created_by == user
 
@@ -70,11 +137,7 @@ class MessageViewSet(viewsets.ModelViewSet):
                 return
 
         elif project:
-            is_member = ProjectMember.objects.filter(project=project, user=user, status='accepted').exists()
-            is_admin = user.role == 'admin'
-            is_creator = project.created_by == user
-
-            if not (is_member or is_admin or is_creator):
+            if not self.can_chat_in_project(project.pk):
                 raise PermissionDenied("You are not authorized to chat in this project.")
 
         serializer.save(sender=user)
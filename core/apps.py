@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        # pymongo only attaches global listeners to clients created after
+        # they are registered; ready() runs before anything (runserver's
+        # migration check included) opens Djongo's MongoClient
+        from .profiling import register_profiler
+        register_profiler()
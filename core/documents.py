@@ -0,0 +1,58 @@
+"""
+Raw Document Writes
+
+Djongo saves rows one INSERT at a time. For bulk paths (invitations,
+notification fan-out) insert_instances() writes many unsaved model instances
+with a single insert_many, producing documents exactly as the ORM would
+(through each field's pre_save()/get_db_prep_save()). Model signals are not
+sent, so callers take care of any side effects themselves.
+"""
+
+from bson import ObjectId
+from django.db import connections
+
+
+def database(using='default'):
+    """The raw pymongo database behind a connection."""
+    return connections[using].cursor().db_conn
+
+
+def collection_for(model, using='default'):
+    """The raw pymongo collection behind `model`."""
+    return database(using)[model._meta.db_table]
+
+
+def to_document(instance, using='default'):
+    """Raw MongoDB document for an unsaved model instance."""
+    connection = connections[using]
+    return {
+        field.column: field.get_db_prep_save(field.pre_save(instance, True), connection)
+        for field in instance._meta.concrete_fields
+    }
+
+
+def insert_instances(model, instances, using='default'):
+    """
+    Insert unsaved `instances` of `model` with one insert_many.
+
+    ObjectId primary keys are assigned up front so the instances can be used
+    (and serialized) afterwards as if they had been saved.
+
+    Raises:
+        pymongo.errors.BulkWriteError: if some documents were rejected; the
+            others are still inserted (the write is unordered)
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+    pk_name = model._meta.pk.attname
+    for instance in instances:
+        if getattr(instance, pk_name, None) is None:
+            setattr(instance, pk_name, ObjectId())
+    collection_for(model, using).insert_many(
+        [to_document(instance, using) for instance in instances], ordered=False,
+    )
+    for instance in instances:
+        instance._state.adding = False
+        instance._state.db = using
+    return instances
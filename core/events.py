@@ -0,0 +1,247 @@
+"""
+Realtime Events
+
+Pushes new notifications and chat messages to connected clients, so they
+don't have to poll unread_count and the chat list on a timer.
+
+- publish() hands events to the broker configured in EVENTS['BROKER'].
+  notifications/signals.py publishes every Notification saved through the
+  ORM, bulk_notify() the rows it inserts, and the chat job each new Message.
+- Each web process has one Hub: a ring buffer of recent events and a
+  wake-up flag per waiting client. The SSE and long-poll views
+  (core/views.py) wait on the hub, so idle clients cost no queries.
+- Brokers carry events to the hubs:
+    'local': dispatches straight into this process's hub (runserver, tests,
+             single-process deployments running jobs eagerly)
+    'mongo': appends to a capped collection that one listener thread per
+             web process tails, so events published by job workers and other
+             web processes reach every hub, in the same order
+- Event ids are assigned by the broker. Clients send back the cursor they
+  were given (Last-Event-ID or ?cursor=) to resume: the last event id this
+  process buffered, or the hub's origin while it has buffered none yet. If
+  it has already left the buffer (or comes from another process's origin),
+  they are told to resync over the REST endpoints.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+
+from .documents import database
+
+
+logger = logging.getLogger(__name__)
+
+
+def _config(key, default):
+    return getattr(settings, 'EVENTS', {}).get(key, default)
+
+
+# ============================================================================
+# IN-PROCESS HUB
+# ============================================================================
+
+class Hub:
+    """Recent events of this process and the clients waiting for them."""
+
+    def __init__(self, buffer_size):
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=buffer_size)  # (sequence, event), oldest first
+        self._sequence = itertools.count(1)
+        self._last = 0
+        self._positions = {}  # event id -> sequence, for buffered events
+        self._waiters = {}    # user id -> set of threading.Event
+        # Cursor for "before this hub's first event"
+        self.origin = f'origin-{ObjectId()}'
+
+    def dispatch(self, event):
+        """
+        Buffer a broker event and wake its recipients.
+
+        Args:
+            event: dict with 'id', 'type', 'users' (user id strings) and 'data'
+        """
+        with self._lock:
+            if event['id'] in self._positions:
+                return
+            if len(self._events) == self._events.maxlen:
+                evicted = self._events.popleft()[1]
+                self._positions.pop(evicted['id'], None)
+            self._last = next(self._sequence)
+            self._events.append((self._last, dict(event, users=frozenset(event['users']))))
+            self._positions[event['id']] = self._last
+            waiters = [waiter for user_id in event['users'] for waiter in self._waiters.get(user_id, ())]
+        for waiter in waiters:
+            waiter.set()
+
+    def wait(self, user_id, cursor=None, timeout=0.0):
+        """
+        Wait up to `timeout` seconds for events addressed to `user_id`.
+
+        Args:
+            user_id (str): Recipient
+            cursor (str): Cursor returned by the previous call; None to
+                start from the newest buffered event
+
+        Returns:
+            (events, cursor, resync): the new events, the cursor to send next
+            time (never None, so no event can slip in between two calls) and
+            whether events may have been missed (the cursor is unknown here,
+            or events were evicted before they could be read)
+        """
+        waiter = threading.Event()
+        with self._lock:
+            if cursor is None:
+                start = self._last
+            elif cursor == self.origin:
+                start = 0
+            else:
+                start = self._positions.get(cursor)
+                if start is None:
+                    return [], self._head(), True
+            self._waiters.setdefault(user_id, set()).add(waiter)
+
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                # Cleared before looking, so a dispatch in between still wakes us
+                waiter.clear()
+                with self._lock:
+                    resync = bool(self._events) and self._events[0][0] > start + 1
+                    events = [event for sequence, event in self._events
+                              if sequence > start and user_id in event['users']]
+                    head = self._head()
+                if events or resync:
+                    return events, head, resync
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], head, False
+                waiter.wait(remaining)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(user_id)
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[user_id]
+
+    def _head(self):
+        return self._events[-1][1]['id'] if self._events else self.origin
+
+
+# ============================================================================
+# BROKERS
+# ============================================================================
+
+class LocalBroker:
+    """Delivers events to this process only."""
+
+    def publish(self, events):
+        for event in events:
+            hub.dispatch(dict(event, id=str(ObjectId())))
+
+    def listen(self):
+        pass
+
+
+class MongoBroker:
+    """
+    Shares events between processes through a capped collection.
+
+    Publishing is one insert; every web process tails the collection with a
+    single tailable cursor, whatever the number of connected clients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collection = None
+        self._listener = None
+
+    def collection(self):
+        if self._collection is None:
+            db = database()
+            name = _config('COLLECTION', 'core_events')
+            try:
+                db.create_collection(name, capped=True, size=_config('COLLECTION_BYTES', 16 * 1024 * 1024))
+            except CollectionInvalid:
+                pass  # already exists
+            except OperationFailure as exc:
+                if exc.code != 48:  # NamespaceExists: another process created it first
+                    raise
+            self._collection = db[name]
+        return self._collection
+
+    def publish(self, events):
+        self.collection().insert_many([dict(event) for event in events], ordered=True)
+
+    def listen(self):
+        """Start this process's listener thread if it isn't running."""
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._tail, name='events-listener', daemon=True)
+                self._listener.start()
+
+    def _tail(self):
+        last_id = None
+        while True:
+            try:
+                collection = self.collection()
+                if last_id is None:
+                    # Only events published from now on
+                    newest = collection.find_one(sort=[('$natural', -1)], projection={'_id': 1})
+                    last_id = newest['_id'] if newest else ObjectId()
+                cursor = collection.find({'_id': {'$gt': last_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    for doc in cursor:
+                        last_id = doc['_id']
+                        hub.dispatch({'id': str(doc['_id']), 'type': doc['type'],
+                                      'users': doc['users'], 'data': doc['data']})
+            except PyMongoError:
+                logger.exception('Event listener lost its cursor')
+            # A tailable cursor dies at once on an empty collection
+            time.sleep(_config('RECONNECT_DELAY', 1.0))
+
+
+BROKERS = {
+    'local': LocalBroker,
+    'mongo': MongoBroker,
+}
+
+hub = Hub(_config('BUFFER_SIZE', 1000))
+broker = BROKERS[_config('BROKER', 'local')]()
+
+
+# ============================================================================
+# PUBLISHING
+# ============================================================================
+
+def enabled():
+    return _config('ENABLED', True)
+
+
+def event(event_type, user_ids, data):
+    """Build an event for publish(); `data` must be JSON-serializable."""
+    return {'type': event_type, 'users': sorted({str(user_id) for user_id in user_ids}), 'data': data}
+
+
+def publish(events):
+    """
+    Publish events built with event(). Delivery is best effort: failures are
+    logged and clients catch up over REST, so callers never fail because of it.
+    """
+    events = [item for item in events if item['users']]
+    if not events or not enabled():
+        return
+    try:
+        broker.publish(events)
+    except PyMongoError:
+        logger.exception('Could not publish %s event(s)', len(events))
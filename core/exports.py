@@ -0,0 +1,143 @@
+"""
+Streaming Exports
+
+Helpers for export endpoints (attendance, time logs, leaves) that stream rows
+from a server-side MongoDB cursor to the client as CSV or NDJSON. Rows are
+pulled from the cursor in batches of EXPORT_BATCH_SIZE and written out one
+at a time, so memory stays flat no matter how many rows are exported.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import csv
+import datetime
+import json
+
+from bson import Decimal128, ObjectId
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Documents fetched from MongoDB per round trip
+EXPORT_BATCH_SIZE = 500
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# ============================================================================
+# REQUEST PARSING
+# ============================================================================
+
+def parse_export_params(request):
+    """
+    Read the query parameters shared by all export endpoints.
+
+    Query Parameters:
+        start (str): First day, YYYY-MM-DD (required)
+        end (str): Last day, YYYY-MM-DD (required)
+        output (str): 'csv' (default) or 'ndjson'
+
+    Returns:
+        (start, end, export_format)
+    """
+    try:
+        start = datetime.datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+        end = datetime.datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError({'error': 'start and end are required (YYYY-MM-DD).'})
+    if end < start:
+        raise ValidationError({'error': 'end must not be before start.'})
+
+    export_format = request.query_params.get('output', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError({'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}."})
+    return start, end, export_format
+
+
+# ============================================================================
+# VALUE CONVERSION
+# ============================================================================
+
+def export_value(value):
+    """Convert a raw BSON value into something CSV/JSON can represent."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, datetime.datetime):
+        # Mongo hands back naive UTC datetimes
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+# ============================================================================
+# STREAM WRITERS
+# ============================================================================
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def _ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row))) + '\n'
+
+
+def export_response(documents, columns, filename, export_format):
+    """
+    Stream `documents` (a pymongo cursor) as CSV or NDJSON.
+
+    Args:
+        documents: Iterable of dicts, typically a batched find/aggregate cursor
+        columns: Document keys to export, in order; also used as headers
+        filename: Download name, without extension
+        export_format: 'csv' or 'ndjson'
+    """
+    rows = ([export_value(doc.get(column)) for column in columns] for doc in documents)
+    lines = _csv_lines(columns, rows) if export_format == 'csv' else _ndjson_lines(columns, rows)
+
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+def lookup_user(local_field, as_field):
+    """Aggregation stages that attach a user's email and name to each row."""
+    from authentication.models import User
+
+    return [
+        {'$lookup': {
+            'from': User._meta.db_table,
+            'localField': local_field,
+            'foreignField': '_id',
+            'as': as_field,
+        }},
+        {'$addFields': {
+            f'{as_field}_email': {'$arrayElemAt': [f'${as_field}.email', 0]},
+            f'{as_field}_name': {'$concat': [
+                {'$ifNull': [{'$arrayElemAt': [f'${as_field}.first_name', 0]}, '']},
+                ' ',
+                {'$ifNull': [{'$arrayElemAt': [f'${as_field}.last_name', 0]}, '']},
+            ]},
+        }},
+    ]
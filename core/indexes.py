@@ -0,0 +1,188 @@
+"""
+MongoDB Index Registry
+
+Every index the application relies on, in one place:
+- derived from the models (auto-created many-to-many tables included):
+  unique and db_index fields (foreign keys are indexed by default),
+  unique_together and Meta.indexes
+- extra_indexes(): what Django can't express (partial and TTL indexes,
+  collections without a model)
+
+ensure_indexes() creates the missing ones. Existing indexes are matched by
+key pattern and options, not by name (migrations and older deployments
+named them their own way), so it can run any number of times.
+index_usage() reads $indexStats to find indexes that are never used or
+not declared here. Both back `manage.py ensure_indexes`.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+
+from django.apps import apps
+from django.conf import settings
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from .documents import database
+
+
+# ============================================================================
+# DECLARATIONS
+# ============================================================================
+
+def model_indexes(model):
+    """IndexModels for what the model's fields and Meta declare."""
+    opts = model._meta
+    indexes = []
+    for field in opts.local_fields:
+        if field.primary_key:
+            continue
+        if field.unique:
+            indexes.append(IndexModel([(field.column, ASCENDING)], unique=True))
+        elif field.db_index:
+            indexes.append(IndexModel([(field.column, ASCENDING)]))
+    for fields in opts.unique_together:
+        indexes.append(IndexModel([(opts.get_field(name).column, ASCENDING) for name in fields], unique=True))
+    for index in opts.indexes:
+        indexes.append(IndexModel([
+            (opts.get_field(name.lstrip('-')).column, DESCENDING if name.startswith('-') else ASCENDING)
+            for name in index.fields
+        ], name=index.name))
+    return indexes
+
+
+def extra_indexes():
+    """
+    Indexes Django can't express, by collection name. They mirror what the
+    migrations and modules that own these collections create.
+    """
+    notifications = getattr(settings, 'NOTIFICATIONS', {})
+    read_ttl_days = notifications.get('READ_TTL_DAYS', 30)
+    indexes = {
+        'jobs_job': [
+            IndexModel([('idempotency_key', ASCENDING)], name='job_idempotency_key', unique=True,
+                       partialFilterExpression={'idempotency_key': {'$type': 'string'}}),
+            IndexModel([('finished_at', ASCENDING)], name='job_done_ttl', expireAfterSeconds=7 * 24 * 3600,
+                       partialFilterExpression={'status': 'done'}),
+        ],
+        'notifications_notification': [
+            IndexModel([('recipient_id', ASCENDING), ('related_id', ASCENDING)], name='notification_chat_unread',
+                       unique=True, partialFilterExpression={'notification_type': 'chat_message', 'is_read': False}),
+        ],
+        notifications.get('ARCHIVE_COLLECTION', 'notifications_archive'): [
+            IndexModel([('user_id', ASCENDING), ('month', ASCENDING)], name='archive_user_month', unique=True),
+        ],
+    }
+    if read_ttl_days > 0:
+        indexes['notifications_notification'].append(
+            IndexModel([('created_at', ASCENDING)], name='notification_read_ttl',
+                       expireAfterSeconds=read_ttl_days * 24 * 3600, partialFilterExpression={'is_read': True}),
+        )
+    return indexes
+
+
+def declared_indexes():
+    """
+    Returns:
+        dict mapping collection name -> list of IndexModel, without duplicates
+    """
+    declared = {}
+    for model in apps.get_models(include_auto_created=True):
+        opts = model._meta
+        if opts.managed and not opts.proxy:
+            declared.setdefault(opts.db_table, []).extend(model_indexes(model))
+    for collection, indexes in extra_indexes().items():
+        declared.setdefault(collection, []).extend(indexes)
+
+    for collection, indexes in declared.items():
+        unique = {}
+        for index in indexes:
+            unique.setdefault(signature(index.document), index)
+        declared[collection] = list(unique.values())
+    return declared
+
+
+# ============================================================================
+# CREATION & REPORTING
+# ============================================================================
+
+def signature(spec):
+    """
+    What makes two indexes equivalent: key pattern and options. `spec` is an
+    IndexModel.document or an index_information() entry.
+    """
+    key = spec['key']
+    key = tuple((name, int(direction)) for name, direction in (key.items() if hasattr(key, 'items') else key))
+    partial = json.dumps(spec.get('partialFilterExpression'), sort_keys=True, default=str)
+    return key, bool(spec.get('unique')), partial, spec.get('expireAfterSeconds')
+
+
+def ensure_indexes(db=None, create=True):
+    """
+    Create every declared index that doesn't exist yet.
+
+    Returns:
+        list of dicts (collection, name, key, status), status being 'exists',
+        'created', 'missing' (with create=False) or 'conflict' (an index
+        with the same key but other options exists; left untouched)
+    """
+    db = db if db is not None else database()
+    report = []
+    for collection_name, indexes in sorted(declared_indexes().items()):
+        collection = db[collection_name]
+        existing = {}
+        for name, info in collection.index_information().items():
+            existing[signature(info)] = name
+        existing_keys = {sig[0]: name for sig, name in existing.items()}
+
+        for index in indexes:
+            document = index.document
+            sig = signature(document)
+            row = {'collection': collection_name, 'name': document['name'], 'key': sig[0]}
+            if sig in existing:
+                row.update(name=existing[sig], status='exists')
+            elif sig[0] in existing_keys:
+                row.update(name=existing_keys[sig[0]], status='conflict')
+            elif create:
+                collection.create_indexes([index])
+                row['status'] = 'created'
+            else:
+                row['status'] = 'missing'
+            report.append(row)
+    return report
+
+
+def index_usage(db=None):
+    """
+    Usage of every existing index since the server started, from $indexStats.
+
+    Returns:
+        list of dicts (collection, name, ops, since, declared), or None when
+        the server doesn't support $indexStats
+    """
+    db = db if db is not None else database()
+    declared = {
+        collection: {signature(index.document) for index in indexes}
+        for collection, indexes in declared_indexes().items()
+    }
+    usage = []
+    for collection_name in sorted(db.list_collection_names()):
+        collection = db[collection_name]
+        try:
+            stats = {doc['name']: doc for doc in collection.aggregate([{'$indexStats': {}}])}
+        except (OperationFailure, NotImplementedError):
+            return None
+        for name, info in collection.index_information().items():
+            if name == '_id_':
+                continue
+            accesses = stats.get(name, {}).get('accesses', {})
+            usage.append({
+                'collection': collection_name,
+                'name': name,
+                'ops': accesses.get('ops'),
+                'since': accesses.get('since'),
+                'declared': signature(info) in declared.get(collection_name, ()),
+            })
+    return usage
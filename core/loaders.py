@@ -0,0 +1,66 @@
+"""
+Batched Loading Helpers
+
+Djongo's prefetch_related support is unreliable, so list serializers that
+would otherwise dereference a relation per row load the related rows
+themselves with one `$in` query per relation and store them in Django's own
+relation caches. Code that later reads `obj.manager` or
+`obj.assigned_members.all()` then gets the cached objects without a query.
+"""
+
+
+def load_by_ids(model, ids):
+    """
+    Fetch rows of `model` by primary key with a single `$in` query.
+
+    Returns:
+        dict mapping pk -> instance (missing ids are simply absent)
+    """
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return {}
+    return {obj.pk: obj for obj in model.objects.filter(pk__in=list(ids))}
+
+
+def prefetch_foreign_key(instances, field_name):
+    """
+    Resolve a ForeignKey on many instances at once.
+
+    Instances whose relation is already cached are left alone, so calling this
+    repeatedly on overlapping lists costs nothing extra.
+
+    Returns:
+        list of the distinct related objects (cached or freshly loaded)
+    """
+    instances = [obj for obj in instances if obj is not None]
+    if not instances:
+        return []
+    field = instances[0]._meta.get_field(field_name)
+    pending = [obj for obj in instances if not field.is_cached(obj)]
+    related = load_by_ids(field.related_model, (getattr(obj, field.attname) for obj in pending))
+    for obj in pending:
+        field.set_cached_value(obj, related.get(getattr(obj, field.attname)))
+
+    resolved = {}
+    for obj in instances:
+        value = field.get_cached_value(obj)
+        if value is not None:
+            resolved.setdefault(value.pk, value)
+    return list(resolved.values())
+
+
+def cache_prefetched(instance, name, objects):
+    """
+    Store `objects` as the prefetched result of a many-valued relation
+    (many-to-many or reverse foreign key), the same way
+    QuerySet.prefetch_related() does.
+    """
+    manager = getattr(instance, name)
+    # Reverse foreign key managers key the cache by the related field instead
+    cache_name = getattr(manager, 'prefetch_cache_name', None) or manager.field.remote_field.get_cache_name()
+    queryset = manager.get_queryset()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    if not hasattr(instance, '_prefetched_objects_cache'):
+        instance._prefetched_objects_cache = {}
+    instance._prefetched_objects_cache[cache_name] = queryset
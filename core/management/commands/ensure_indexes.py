@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core.indexes import ensure_indexes, index_usage
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the MongoDB indexes declared by the models and core/indexes.py "
+        "that don't exist yet, then report unused and undeclared indexes from $indexStats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report missing indexes')
+        parser.add_argument('--no-usage', action='store_true', help='Skip the $indexStats report')
+
+    def handle(self, *args, **options):
+        report = ensure_indexes(create=not options['dry_run'])
+        for row in report:
+            if row['status'] == 'exists':
+                continue
+            key = ', '.join(f'{name}:{direction}' for name, direction in row['key'])
+            style = self.style.WARNING if row['status'] in ('missing', 'conflict') else self.style.SUCCESS
+            self.stdout.write(style(f"{row['status']:<9} {row['collection']}.{row['name']} ({key})"))
+        counts = {status: sum(row['status'] == status for row in report)
+                  for status in ('exists', 'created', 'missing', 'conflict')}
+        self.stdout.write(', '.join(f'{count} {status}' for status, count in counts.items() if count) or 'No indexes declared.')
+        if counts['conflict']:
+            self.stdout.write(self.style.WARNING(
+                'Conflicting indexes have the declared key but other options; drop them to recreate, '
+                'or for notification_read_ttl run `manage.py archive_notifications`.'
+            ))
+
+        if options['no_usage']:
+            return
+        usage = index_usage()
+        if usage is None:
+            self.stdout.write('Index usage is not available from this server ($indexStats).')
+            return
+        unused = [row for row in usage if row['ops'] == 0]
+        undeclared = [row for row in usage if not row['declared']]
+        self.stdout.write(f'\nUnused since the server started ({len(unused)}):')
+        for row in unused:
+            self.stdout.write(f"  {row['collection']}.{row['name']} (since {row['since']})")
+        self.stdout.write(f'Not declared by the application ({len(undeclared)}):')
+        for row in undeclared:
+            self.stdout.write(f"  {row['collection']}.{row['name']} ({row['ops']} ops)")
@@ -0,0 +1,57 @@
+"""
+Pagination for HR System API
+
+Keyset (cursor) pagination that works with Djongo. The cursor stores the
+value of the first ordering field of the last row served, and the next page
+is fetched with a `<field>__lt/__gt` filter instead of a skip/offset, so deep
+pages cost the same as the first one.
+
+By default rows are ordered by `_id`: ObjectIds are unique and increase with
+insertion time, which gives a stable order without an extra index. Views can
+order by another field (e.g. `-deadline`) by setting `cursor_ordering`; add
+`_id` as the last field so rows with equal values keep a stable order.
+"""
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class MongoCursorPagination(CursorPagination):
+    """
+    Default pagination class for all list endpoints.
+
+    Query Parameters:
+        cursor (str): Opaque cursor taken from the `next`/`previous` links
+        page_size (int): Rows per page, capped at MAX_PAGE_SIZE
+    """
+    ordering = '-_id'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'MAX_PAGE_SIZE', 200)
+
+    def get_ordering(self, request, queryset, view):
+        """Use the view's `cursor_ordering` if it declares one."""
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            return super().get_ordering(request, queryset, view)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def decode_cursor(self, request):
+        """
+        Turn an `_id` position back into an ObjectId: Djongo passes strings
+        through as-is, and a string never compares with an ObjectId.
+        """
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None or self.ordering[0].lstrip('-') != '_id':
+            return cursor
+        try:
+            return cursor._replace(position=ObjectId(cursor.position))
+        except InvalidId:
+            raise NotFound(self.invalid_cursor_message)
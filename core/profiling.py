@@ -0,0 +1,225 @@
+"""
+Request Profiling
+
+Records, for every request, how many MongoDB commands it issued, the time
+spent in them, the slowest one and the size of the response body. A pymongo
+CommandListener feeds per-request stats kept in a thread local (pymongo
+calls listeners on the thread running the command); ProfilingMiddleware
+opens and closes them around each request and:
+
+- adds a `Server-Timing` header (`mongo;dur=..;desc="N commands", app;dur=..`)
+- writes one JSON log line per request to the `core.profiling` logger
+  (WARNING for requests slower than PROFILING['SLOW_REQUEST_MS'])
+- aggregates the numbers per URL name, served to admins by
+  ProfilingStatsView, which is where N+1 endpoints stand out
+
+The listener is registered globally by CoreConfig.ready() (core/apps.py).
+pymongo only attaches global listeners to clients created afterwards, and
+Django may open Djongo's MongoClient before it loads the middleware (e.g.
+runserver's migration check), so importing this module is too late.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from pymongo import monitoring
+
+
+logger = logging.getLogger(__name__)
+
+# Connection housekeeping, not queries
+IGNORED_COMMANDS = {'isMaster', 'ismaster', 'hello', 'ping', 'endSessions', 'buildInfo', 'saslStart', 'saslContinue'}
+
+_local = threading.local()
+
+
+def _config(key, default):
+    return getattr(settings, 'PROFILING', {}).get(key, default)
+
+
+# ============================================================================
+# PER-REQUEST STATS
+# ============================================================================
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.commands = 0
+        self.mongo_ms = 0.0
+        self.slowest = None  # (duration_ms, command, collection)
+        self.pending = {}
+
+    def record(self, command, collection, duration_ms):
+        self.commands += 1
+        self.mongo_ms += duration_ms
+        if self.slowest is None or duration_ms > self.slowest[0]:
+            self.slowest = (duration_ms, command, collection)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def current_stats():
+    """Stats of the request running on this thread, or None outside requests."""
+    return getattr(_local, 'stats', None)
+
+
+class CommandProfiler(monitoring.CommandListener):
+    """Adds every MongoDB command to the current request's stats."""
+
+    def started(self, event):
+        stats = current_stats()
+        if stats is None or event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        stats.pending[event.request_id] = (event.command_name, collection if isinstance(collection, str) else None)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        stats = current_stats()
+        if stats is None:
+            return
+        pending = stats.pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        command, collection = pending
+        duration_ms = event.duration_micros / 1000
+        stats.record(command, collection, duration_ms)
+        if duration_ms >= _config('SLOW_COMMAND_MS', 100):
+            logger.warning(json.dumps({
+                'event': 'slow_mongo_command',
+                'command': command,
+                'collection': collection,
+                'duration_ms': round(duration_ms, 2),
+            }))
+
+
+command_profiler = CommandProfiler()
+_registered = False
+
+
+def register_profiler():
+    """Register command_profiler with pymongo (once)."""
+    global _registered
+    if not _registered:
+        monitoring.register(command_profiler)
+        _registered = True
+
+
+# ============================================================================
+# PER-URL AGGREGATES
+# ============================================================================
+
+class EndpointStats:
+    """Running totals per URL name, shared by all threads of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, name, duration_ms, stats, payload_bytes, slow):
+        with self._lock:
+            entry = self._endpoints.setdefault(name, {
+                'requests': 0, 'total_ms': 0.0, 'mongo_ms': 0.0, 'commands': 0,
+                'max_commands': 0, 'bytes': 0, 'max_bytes': 0, 'slow_requests': 0,
+            })
+            entry['requests'] += 1
+            entry['total_ms'] += duration_ms
+            entry['mongo_ms'] += stats.mongo_ms
+            entry['commands'] += stats.commands
+            entry['max_commands'] = max(entry['max_commands'], stats.commands)
+            entry['bytes'] += payload_bytes or 0
+            entry['max_bytes'] = max(entry['max_bytes'], payload_bytes or 0)
+            entry['slow_requests'] += slow
+
+    def snapshot(self):
+        """Per-endpoint averages, the most Mongo commands per request first."""
+        with self._lock:
+            endpoints = {name: dict(entry) for name, entry in self._endpoints.items()}
+
+        rows = []
+        for name, entry in endpoints.items():
+            count = entry['requests']
+            rows.append({
+                'url_name': name,
+                'requests': count,
+                'avg_ms': round(entry['total_ms'] / count, 2),
+                'avg_mongo_ms': round(entry['mongo_ms'] / count, 2),
+                'avg_commands': round(entry['commands'] / count, 2),
+                'max_commands': entry['max_commands'],
+                'avg_bytes': round(entry['bytes'] / count),
+                'max_bytes': entry['max_bytes'],
+                'slow_requests': entry['slow_requests'],
+            })
+        return sorted(rows, key=lambda row: row['avg_commands'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+endpoint_stats = EndpointStats()
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _config('ENABLED', True):
+            return self.get_response(request)
+
+        _local.stats = stats = RequestStats()
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.stats = None
+
+        duration_ms = stats.elapsed_ms()
+        payload_bytes = None if response.streaming else len(response.content)
+        match = getattr(request, 'resolver_match', None)
+        url_name = (match.view_name if match else None) or 'unresolved'
+        slow = duration_ms >= _config('SLOW_REQUEST_MS', 500)
+
+        if _config('SERVER_TIMING', True):
+            response['Server-Timing'] = (
+                f'mongo;dur={stats.mongo_ms:.2f};desc="{stats.commands} commands", '
+                f'app;dur={duration_ms:.2f}'
+            )
+
+        record = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'url_name': url_name,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'mongo_commands': stats.commands,
+            'mongo_ms': round(stats.mongo_ms, 2),
+            'bytes': payload_bytes,
+        }
+        if stats.slowest:
+            record['slowest_command'] = {
+                'command': stats.slowest[1],
+                'collection': stats.slowest[2],
+                'duration_ms': round(stats.slowest[0], 2),
+            }
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
+
+        endpoint_stats.add(url_name, duration_ms, stats, payload_bytes, slow)
+        return response
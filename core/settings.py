@@ -68,6 +68,8 @@ INSTALLED_APPS = [
     'projects',        # Project management
     'chat',            # Internal messaging system
     'notifications',   # Notification system
+    'jobs',            # Background job queue
+    'core',            # Shared infrastructure (management commands, profiling)
 ]
 
 # ============================================================================
@@ -75,6 +77,7 @@ INSTALLED_APPS = [
 # ============================================================================
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be before CommonMiddleware
+    'core.profiling.ProfilingMiddleware',  # Per-request Mongo command stats
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', # Add WhiteNoise for static files
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -188,8 +191,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Keyset pagination on _id for all list endpoints (see core/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.MongoCursorPagination',
+    'PAGE_SIZE': int(os.getenv('PAGE_SIZE', '50')),
 }
 
+# Upper bound for the ?page_size= query parameter
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '200'))
+
 # ============================================================================
 # JWT AUTHENTICATION CONFIGURATION
 # ============================================================================
@@ -201,6 +210,130 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': '_id',  # MongoDB uses _id instead of id
+    # Tokens carry role/manager_id/is_active claims for ClaimsJWTAuthentication
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.ClaimsTokenRefreshSerializer',
+}
+
+# ============================================================================
+# USER CACHE CONFIGURATION
+# ============================================================================
+# Cache for users resolved from JWTs (see authentication/cache.py).
+# BACKEND: 'local' (in-process LRU), 'django' (uses CACHES[CACHE_ALIAS]) or 'none'
+# TIMEOUT bounds how long a deactivated/deleted user can stay cached in
+# another worker process.
+USER_CACHE = {
+    'BACKEND': os.getenv('USER_CACHE_BACKEND', 'local'),
+    'TIMEOUT': int(os.getenv('USER_CACHE_TIMEOUT', '60')),  # seconds
+    'MAX_ENTRIES': int(os.getenv('USER_CACHE_MAX_ENTRIES', '2048')),
+    'CACHE_ALIAS': os.getenv('USER_CACHE_ALIAS', 'default'),
+}
+
+# ============================================================================
+# ATTENDANCE CONFIGURATION
+# ============================================================================
+# First check-in later than this (local time, HH:MM) is reported as late
+ATTENDANCE_LATE_AFTER = os.getenv('ATTENDANCE_LATE_AFTER', '09:30')
+
+# Weekdays (Monday=0) that are not counted as absences; Saturday in Nepal
+ATTENDANCE_WEEKEND_DAYS = (5,)
+
+# ============================================================================
+# BACKGROUND JOBS CONFIGURATION
+# ============================================================================
+# MongoDB-backed job queue (see jobs/queue.py), processed by
+# `python manage.py run_workers`. Jobs run inline (ALWAYS_EAGER) unless
+# JOBS_ALWAYS_EAGER=False, which only deployments that run a worker set (the
+# Procfile does): without one, queued jobs would never run. Periodic jobs
+# need a worker; elsewhere schedule reconcile_unread_counters and
+# archive_notifications instead.
+JOBS = {
+    'ALWAYS_EAGER': os.getenv('JOBS_ALWAYS_EAGER', 'True') == 'True',
+    'MAX_ATTEMPTS': int(os.getenv('JOBS_MAX_ATTEMPTS', '5')),
+    'RETRY_BACKOFF': 10,     # seconds before the first retry, doubled per attempt
+    'MAX_BACKOFF': 3600,     # seconds
+    'LEASE_SECONDS': 300,    # a running job is retried if not finished by then
+    'POLL_INTERVAL': 1.0,    # seconds between polls when the queue is empty
+    # Jobs queued by the workers every N seconds
+    'PERIODIC': {
+        'notifications.reconcile_unread': int(os.getenv('UNREAD_RECONCILE_INTERVAL', '3600')),
+        'notifications.archive': 24 * 3600,
+    },
+}
+
+# ============================================================================
+# NOTIFICATION RETENTION CONFIGURATION
+# ============================================================================
+# See notifications/retention.py. Changes to READ_TTL_DAYS are applied to the
+# TTL index by `python manage.py archive_notifications` (and the daily job).
+NOTIFICATIONS = {
+    'READ_TTL_DAYS': int(os.getenv('NOTIFICATIONS_READ_TTL_DAYS', '30')),            # 0 keeps read ones forever
+    'ARCHIVE_AFTER_DAYS': int(os.getenv('NOTIFICATIONS_ARCHIVE_AFTER_DAYS', '90')),  # unread ones are archived after
+    'ARCHIVE_COLLECTION': 'notifications_archive',
+    'ARCHIVE_BATCH_SIZE': 1000,
+}
+
+# ============================================================================
+# REALTIME EVENTS CONFIGURATION
+# ============================================================================
+# Push of new notifications and chat messages over SSE / long-poll (see
+# core/events.py). The 'mongo' broker shares events between the web and
+# worker processes through a capped collection; 'local' stays in-process.
+#
+# The web runs gunicorn gthread workers (Procfile, nixpacks.toml):
+# WEB_CONCURRENCY processes of WEB_THREADS threads each. An open SSE stream
+# holds a thread for up to STREAM_SECONDS and a long-poll for up to
+# POLL_TIMEOUT, so only MAX_WAITING threads per process may wait on events;
+# the others are kept for the REST API. Clients above the limit are told to
+# come back after BUSY_RETRY seconds. Connected clients per instance are thus
+# WEB_CONCURRENCY x MAX_WAITING (2 x 48 by default): raise WEB_THREADS (idle
+# threads are cheap) or add instances for more.
+WEB_THREADS = int(os.getenv('WEB_THREADS', '64'))
+EVENTS = {
+    'ENABLED': os.getenv('EVENTS_ENABLED', 'True') == 'True',
+    'BROKER': os.getenv('EVENTS_BROKER', 'mongo'),
+    'COLLECTION': 'core_events',
+    'COLLECTION_BYTES': 16 * 1024 * 1024,  # capped collection size
+    'BUFFER_SIZE': 1000,     # recent events kept per process for resuming clients
+    'POLL_TIMEOUT': 25,      # seconds, longest long-poll wait
+    'HEARTBEAT': 15,         # seconds between SSE keep-alives
+    'STREAM_SECONDS': 300,   # an SSE stream is closed (and reconnects) after this
+    'RECONNECT_DELAY': 1.0,  # seconds before the listener reopens its cursor
+    'MAX_WAITING': int(os.getenv('EVENTS_MAX_WAITING', str(WEB_THREADS * 3 // 4))),  # per process
+    'BUSY_RETRY': 10,        # seconds, Retry-After sent above MAX_WAITING
+}
+
+# ============================================================================
+# PROFILING CONFIGURATION
+# ============================================================================
+# Per-request MongoDB command profiling (see core/profiling.py)
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING_ENABLED', 'True') == 'True',
+    'SERVER_TIMING': os.getenv('PROFILING_SERVER_TIMING', 'True') == 'True',
+    'SLOW_REQUEST_MS': int(os.getenv('PROFILING_SLOW_REQUEST_MS', '500')),
+    'SLOW_COMMAND_MS': int(os.getenv('PROFILING_SLOW_COMMAND_MS', '100')),
+}
+
+# ============================================================================
+# LOGGING CONFIGURATION
+# ============================================================================
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {
+            'handlers': ['console'],
+            'level': os.getenv('PROFILING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'authentication': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
 }
 
 # ============================================================================
@@ -0,0 +1,73 @@
+"""
+Test Helpers
+
+MongomockTestCase runs a test case against an in-memory mongomock database
+instead of the configured server, so behavior tests need neither a mongod
+nor a test database. mongomock is a test-only dependency; without it these
+tests are skipped:
+
+    pip install mongomock
+    python manage.py test jobs notifications attendance
+"""
+
+import unittest
+
+from django.db import connections
+from django.test.utils import override_settings
+
+from .documents import database
+from .indexes import declared_indexes
+
+
+class MongomockTestCase(unittest.TestCase):
+    """
+    Points the default connection at a mongomock client for the duration of
+    the test case. Every test starts from an empty database with the declared
+    indexes (core/indexes.py), so unique keys behave as in production.
+
+    `settings_overrides` (a dict) is applied around each test, like
+    override_settings, which only decorates Django's own TestCase classes.
+    """
+    settings_overrides = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        try:
+            import mongomock
+        except ImportError:
+            raise unittest.SkipTest('mongomock is not installed')
+        from djongo import database as djongo_database
+
+        connection = connections['default']
+        cls._database_name = connection.settings_dict['NAME']
+        name = f'test_{cls._database_name}_mongomock'
+        # Djongo reuses the client it has cached under the database name
+        djongo_database.clients[name] = mongomock.MongoClient()
+        connection.close()
+        connection.settings_dict['NAME'] = name
+
+    @classmethod
+    def tearDownClass(cls):
+        from djongo import database as djongo_database
+
+        connection = connections['default']
+        connection.close()
+        djongo_database.clients.pop(connection.settings_dict['NAME'], None)
+        connection.settings_dict['NAME'] = cls._database_name
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        overrides = override_settings(**self.settings_overrides)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        db = database()
+        for name in db.list_collection_names():
+            db.drop_collection(name)
+        # One by one: mongomock's create_indexes() drops partialFilterExpression
+        for collection, indexes in declared_indexes().items():
+            for index in indexes:
+                options = dict(index.document)
+                db[collection].create_index(list(options.pop('key').items()), **options)
@@ -0,0 +1,378 @@
+"""
+Query-Plan Regression Tests
+
+Djongo turns ORM calls into MongoDB commands behind our back, so an
+innocent change to a view can make a hot endpoint scan a whole collection.
+These tests call each hot endpoint against a real mongod, capture the
+commands it sends, run explain() on each of them and fail when a winning
+plan contains a COLLSCAN, sorts more than one document in memory (a
+blocking SORT stage), or examines more than MAX_EXAMINED_RATIO documents
+per document returned. Aggregations that filter after a $lookup (how Djongo
+translates filters across a many-to-many relation) fail too: that filter
+runs on every joined document.
+
+They need a real server and a throwaway database, so they only run with the
+benchmark settings (see benchmarks/settings.py) and are skipped otherwise:
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py test core
+
+Unfiltered commands are checked like the others; Djongo's own __schema__
+bookkeeping is not.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import copy
+import datetime
+import os
+import unittest
+
+from bson import SON
+from django.conf import settings
+from django.test import Client
+from django.utils import timezone
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+
+# A plan fails when it examines more than this many documents per document
+# returned, once it examines at least MIN_EXAMINED of them
+MAX_EXAMINED_RATIO = float(os.getenv('QUERY_PLAN_MAX_RATIO', '10'))
+MIN_EXAMINED = int(os.getenv('QUERY_PLAN_MIN_EXAMINED', '50'))
+
+EXPLAINABLE_COMMANDS = {'find', 'aggregate', 'count', 'distinct', 'findAndModify', 'update', 'delete'}
+IGNORED_COLLECTIONS = {'__schema__'}
+
+# Top-level command fields explain() does not accept
+SESSION_FIELDS = {'lsid', 'txnNumber', 'autocommit', 'startTransaction', 'writeConcern', 'readConcern', 'ordered'}
+
+
+# ============================================================================
+# COMMAND CAPTURE & PLAN ANALYSIS
+# ============================================================================
+
+class CommandCapture(monitoring.CommandListener):
+    """Keeps the explainable commands sent between start() and stop()."""
+
+    def __init__(self):
+        self.commands = None
+
+    def start(self):
+        self.commands = []
+
+    def stop(self):
+        commands, self.commands = self.commands or [], None
+        return commands
+
+    def started(self, event):
+        if self.commands is not None and event.command_name in EXPLAINABLE_COMMANDS:
+            self.commands.append((event.command_name, copy.deepcopy(event.command)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Registered on import, before Djongo creates its MongoClient (clients only
+# pick up listeners registered before they are created)
+capture = CommandCapture()
+monitoring.register(capture)
+
+
+def explain_commands(name, command):
+    """Explain-ready copies of a captured command, one per update/delete statement."""
+    body = SON((key, value) for key, value in command.items()
+               if not key.startswith('$') and key not in SESSION_FIELDS)
+    statements = {'update': 'updates', 'delete': 'deletes'}.get(name)
+    if statements is None:
+        yield body
+        return
+    for statement in body.pop(statements, []):
+        single = SON(body)
+        single[statements] = [statement]
+        yield single
+
+
+def query_filter(name, command):
+    """The filter a command selects documents with (None if it has none)."""
+    if name == 'find':
+        return command.get('filter')
+    if name in ('count', 'distinct', 'findAndModify'):
+        return command.get('query')
+    if name == 'aggregate':
+        pipeline = command.get('pipeline') or [{}]
+        return pipeline[0].get('$match')
+    # update/delete: one statement per explained command
+    statement = (command.get('updates') or command.get('deletes'))[0]
+    return statement.get('q')
+
+
+def winning_stages(node):
+    """Every stage of the chosen plan(s) in an explain() result."""
+    if isinstance(node, dict):
+        if 'stage' in node:
+            yield node['stage']
+        for key, value in node.items():
+            if key not in ('rejectedPlans', 'allPlansExecution'):
+                yield from winning_stages(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from winning_stages(item)
+
+
+def execution_stats(node):
+    """Every executionStats section of an explain() result."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'executionStats' and isinstance(value, dict):
+                yield value
+            else:
+                yield from execution_stats(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from execution_stats(item)
+
+
+def filters_after_lookup(name, command):
+    """Does an aggregation $match on documents a $lookup has joined in?"""
+    if name != 'aggregate':
+        return False
+    joined = False
+    for stage in command.get('pipeline') or []:
+        if '$group' in stage:
+            return False
+        joined = joined or '$lookup' in stage
+        if joined and '$match' in stage:
+            return True
+    return False
+
+
+def plan_problems(db, name, command):
+    """
+    Explain a captured command.
+
+    Returns:
+        list of human-readable problems (empty when the plan is fine)
+    """
+    problems = []
+    for explained in explain_commands(name, command):
+        collection = explained.get(name)
+        if collection in IGNORED_COLLECTIONS:
+            continue
+        where = f'{name} on {collection} with {query_filter(name, explained) or "no filter"}'
+        if filters_after_lookup(name, explained):
+            problems.append(f'$match after $lookup: {where}')
+        result = db.command('explain', explained, verbosity='executionStats')
+        stages = set(winning_stages(result))
+        if 'COLLSCAN' in stages:
+            problems.append(f'COLLSCAN: {where}')
+        for stats in execution_stats(result):
+            examined = stats.get('totalDocsExamined', 0)
+            returned = stats.get('nReturned', 0)
+            # Sorting the one document a unique key found costs nothing
+            if 'SORT' in stages and examined > 1:
+                problems.append(f'in-memory SORT of {examined} documents: {where}')
+            if examined >= MIN_EXAMINED and examined > MAX_EXAMINED_RATIO * max(returned, 1):
+                problems.append(f'{examined} documents examined for {returned} returned: {where}')
+    return problems
+
+
+# ============================================================================
+# HOT ENDPOINT TESTS
+# ============================================================================
+
+class QueryPlanTests(unittest.TestCase):
+    """Hot endpoints must be served by indexes."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if 'bench' not in settings.DATABASES['default']['NAME']:
+            raise unittest.SkipTest(
+                'Query-plan tests reseed their database; run them with DJANGO_SETTINGS_MODULE=benchmarks.settings'
+            )
+
+        from core.documents import database
+        cls.db = database()
+        if type(cls.db.client).__module__.startswith('mongomock'):
+            raise unittest.SkipTest('Query-plan tests need a real mongod (mongomock has no explain)')
+        try:
+            cls.db.client.admin.command('ping')
+        except PyMongoError as exc:
+            raise unittest.SkipTest(f'No MongoDB server for the query-plan tests: {exc}')
+
+        cls.dataset = cls.seed()
+        cls.client = Client()
+        cls.tokens = {}
+
+    @classmethod
+    def seed(cls):
+        from benchmarks.seed import seed
+        from core.documents import insert_instances
+        from core.indexes import ensure_indexes
+        from attendance.models import LeaveRequest
+        from authentication.models import User
+        from tasks.models import Task, TimeLog
+
+        dataset = seed({'users': 60, 'tasks': 300, 'messages': 600, 'notifications_per_user': 30,
+                        'attendance_days': 10})
+        ensure_indexes(cls.db)
+
+        # Leaves and time logs, which the benchmark data set doesn't include
+        today = timezone.now().date()
+        employees = list(User.objects.filter(role='employee'))
+        tasks = list(Task.objects.all()[:50])
+        insert_instances(LeaveRequest, [
+            LeaveRequest(employee=user, manager_id=user.manager_id, reason='Query plan test',
+                         start_date=today - datetime.timedelta(days=i % 20),
+                         end_date=today + datetime.timedelta(days=i % 3 - 1),
+                         status=('approved', 'pending', 'rejected')[i % 3])
+            for i, user in enumerate(employees * 3)
+        ])
+        insert_instances(TimeLog, [
+            TimeLog(employee=user, task=tasks[i % len(tasks)], date=today - datetime.timedelta(days=i % 15),
+                    hours=2, description='Query plan test')
+            for i, user in enumerate(employees * 5)
+        ])
+        return dataset
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def auth(self, email):
+        if email not in self.tokens:
+            response = self.client.post('/api/auth/login/', {'email': email, 'password': self.dataset['password']},
+                                        content_type='application/json')
+            self.tokens[email] = response.json()['access']
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.tokens[email]}'}
+
+    def assertIndexedQueries(self, method, path, email=None, data=None, **extra):
+        """Call an endpoint and fail if any command it sent has a bad plan."""
+        headers = self.auth(email) if email else {}
+        if method != 'get':
+            data, headers['content_type'] = data or {}, 'application/json'
+
+        capture.start()
+        try:
+            response = getattr(self.client, method)(path, data, **headers, **extra)
+            # Streamed bodies run their queries while they are read
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+        finally:
+            commands = capture.stop()
+        self.assertLess(response.status_code, 400, f'{method.upper()} {path}: {content[:300]}')
+        self.assertTrue(commands, f'{method.upper()} {path} sent no commands; is command monitoring active?')
+
+        problems = []
+        for name, command in commands:
+            problems.extend(plan_problems(self.db, name, command))
+        self.assertFalse(problems, f'{method.upper()} {path}:\n  ' + '\n  '.join(problems))
+        return response
+
+    @property
+    def employee(self):
+        return self.dataset['employees'][0]
+
+    @property
+    def project_member(self):
+        project_id = self.dataset['project_ids'][0]
+        return project_id, self.dataset['member_emails'][project_id][1]
+
+    # ------------------------------------------------------------------
+    # Authentication & attendance
+    # ------------------------------------------------------------------
+
+    def test_login(self):
+        self.assertIndexedQueries('post', '/api/auth/login/', data={
+            'email': self.dataset['employees'][1], 'password': self.dataset['password'],
+        })
+
+    def test_check_in_and_out(self):
+        email = self.dataset['employees'][2]
+        self.assertIndexedQueries('post', '/api/attendance/checkin/', email, {'location_in': 'Test'})
+        self.assertIndexedQueries('get', '/api/attendance/status/', email)
+        self.assertIndexedQueries('patch', '/api/attendance/checkout/', email, {'location_out': 'Test'})
+
+    def test_attendance_logs(self):
+        self.assertIndexedQueries('get', '/api/attendance/logs/', self.employee)
+
+    def test_attendance_report(self):
+        from attendance.reports import GROUP_BY_CHOICES
+
+        today = timezone.localdate()
+        path = '/api/attendance/report/'
+        for group_by in GROUP_BY_CHOICES:
+            params = {'start': (today - datetime.timedelta(days=13)).isoformat(), 'end': today.isoformat(),
+                      'group_by': group_by}
+            for email in (self.dataset['manager'], self.employee):
+                response = self.assertIndexedQueries('get', path, email, params)
+                self.assertTrue(response.json()['rows'], f'{group_by} report for {email} is empty')
+            # Admins read every active user on purpose, so only the response is checked
+            response = self.client.get(path, params, **self.auth(self.dataset['admin']))
+            self.assertEqual(response.status_code, 200, response.content[:300])
+
+        # Days that haven't happened yet are never absences
+        params = {'start': (today + datetime.timedelta(days=1)).isoformat(),
+                  'end': (today + datetime.timedelta(days=14)).isoformat(), 'group_by': 'employee'}
+        rows = self.assertIndexedQueries('get', path, self.dataset['manager'], params).json()['rows']
+        self.assertEqual([row[4] for row in rows], [0] * len(rows))
+
+    def test_exports(self):
+        today = timezone.now().date()
+        params = {'start': (today - datetime.timedelta(days=13)).isoformat(), 'end': today.isoformat()}
+        for path in ('/api/attendance/export/', '/api/attendance/leaves/export/', '/api/tasks/timelogs/export/'):
+            for email in (self.dataset['manager'], self.employee):
+                self.assertIndexedQueries('get', path, email, params)
+            response = self.client.get(path, params, **self.auth(self.dataset['admin']))
+            self.assertEqual(response.status_code, 200)
+
+    # ------------------------------------------------------------------
+    # Leaves
+    # ------------------------------------------------------------------
+
+    def test_whos_on_leave(self):
+        self.assertIndexedQueries('get', '/api/attendance/leaves/whos-out/', self.dataset['manager'])
+
+    def test_leave_lists(self):
+        self.assertIndexedQueries('get', '/api/attendance/leaves/my/', self.employee)
+        self.assertIndexedQueries('get', '/api/attendance/leaves/subordinate/', self.dataset['manager'])
+        self.assertIndexedQueries('get', '/api/attendance/leaves/subordinate/', self.dataset['admin'])
+
+    # ------------------------------------------------------------------
+    # Tasks & projects
+    # ------------------------------------------------------------------
+
+    def test_task_lists(self):
+        self.assertIndexedQueries('get', '/api/tasks/my/', self.employee)
+        self.assertIndexedQueries('get', '/api/tasks/', self.dataset['manager'])
+
+    def test_time_logs(self):
+        self.assertIndexedQueries('get', '/api/tasks/timelogs/my/', self.employee)
+
+    def test_project_list(self):
+        self.assertIndexedQueries('get', '/api/projects/projects/', self.dataset['manager'])
+        self.assertIndexedQueries('get', '/api/projects/projects/', self.employee)
+
+    # ------------------------------------------------------------------
+    # Chat & notifications
+    # ------------------------------------------------------------------
+
+    def test_chat_list_and_sync(self):
+        project_id, member = self.project_member
+        response = self.assertIndexedQueries('get', '/api/chat/messages/', member, {'project': project_id})
+        newest = response.json()['results'][0]['id']
+        self.assertIndexedQueries('get', '/api/chat/messages/', member, {'project': project_id, 'after': newest})
+
+    def test_task_chat_list_and_sync(self):
+        task_id, members = next(iter(self.dataset['task_channels'].items()))
+        response = self.assertIndexedQueries('get', '/api/chat/messages/', members[0], {'task': task_id})
+        newest = response.json()['results'][0]['id']
+        self.assertIndexedQueries('get', '/api/chat/messages/', members[0], {'task': task_id, 'after': newest})
+
+    def test_notifications(self):
+        self.assertIndexedQueries('get', '/api/notifications/', self.employee)
+        self.assertIndexedQueries('get', '/api/notifications/unread_count/', self.employee)
+        self.assertIndexedQueries('post', '/api/notifications/mark_all_as_read/', self.employee)
@@ -11,6 +11,8 @@ from django.http import HttpResponse
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import EventPollView, EventStreamView, ProfilingStatsView
+
 
 # ============================================================================
 # HOME VIEW
@@ -42,6 +44,9 @@ urlpatterns = [
     path('api/projects/', include('projects.urls')),        # Project & team management
     path('api/chat/', include('chat.urls')),                # Team communication
     path('api/notifications/', include('notifications.urls')),  # Notifications
+    path('api/profiling/', ProfilingStatsView.as_view(), name='profiling-stats'),  # Per-endpoint query profile
+    path('api/events/', EventPollView.as_view(), name='events-poll'),              # Realtime events (long-poll)
+    path('api/events/stream/', EventStreamView.as_view(), name='events-stream'),   # Realtime events (SSE)
 ]
 
 
@@ -0,0 +1,178 @@
+"""
+Core Views
+
+Operational endpoints that don't belong to a single app, and the realtime
+event endpoints (see core/events.py).
+"""
+
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from authentication.auth import QueryTokenJWTAuthentication
+from . import events
+from .profiling import endpoint_stats
+
+
+# ============================================================================
+# PROFILING VIEWS
+# ============================================================================
+
+class ProfilingStatsView(APIView):
+    """
+    Per-URL request profile of this worker process (see core/profiling.py).
+
+    GET returns the endpoints sorted by average MongoDB commands per request;
+    DELETE resets the counters. Admins only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response({"error": "Only admins can view profiling stats."}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'endpoints': endpoint_stats.snapshot()})
+
+    def delete(self, request):
+        if request.user.role != 'admin':
+            return Response({"error": "Only admins can reset profiling stats."}, status=status.HTTP_403_FORBIDDEN)
+        endpoint_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ============================================================================
+# REALTIME EVENT VIEWS
+# ============================================================================
+
+def _events_config(key, default):
+    return getattr(settings, 'EVENTS', {}).get(key, default)
+
+
+# Threads of this process that may wait on the hub at once (see EVENTS in
+# core/settings.py); the rest of the pool stays free for the REST API
+_waiting = threading.BoundedSemaphore(_events_config('MAX_WAITING', 48))
+
+
+def _client_event(event):
+    return {'id': event['id'], 'type': event['type'], 'data': event['data']}
+
+
+class EventPollView(APIView):
+    """
+    Long-poll for new notifications and chat messages.
+
+    Answers as soon as an event for the user arrives, or with an empty list
+    after `timeout` seconds. Works under WSGI and ASGI.
+
+    Query Parameters:
+        cursor (str): The cursor returned by the previous call; omit on the first
+        timeout (float): Seconds to wait, at most EVENTS['POLL_TIMEOUT']
+        token (str): Access token, if not sent in the Authorization header
+
+    Returns:
+        {"events": [{"id", "type", "data"}], "cursor": str, "resync": bool}
+        type is "notification" or "message" and data is serialized as the
+        REST endpoints do. resync means events may have been missed: reload
+        the unread count and chats over REST, then keep polling from `cursor`.
+        503 with Retry-After when EVENTS['MAX_WAITING'] clients are already
+        waiting in this process.
+    """
+    authentication_classes = [QueryTokenJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        max_timeout = _events_config('POLL_TIMEOUT', 25)
+        try:
+            timeout = float(request.query_params.get('timeout', max_timeout))
+        except ValueError:
+            raise ValidationError({'error': 'timeout must be a number of seconds.'})
+
+        if not _waiting.acquire(blocking=False):
+            response = Response({'error': 'Too many clients are waiting for events; retry later.'},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(_events_config('BUSY_RETRY', 10))
+            return response
+        try:
+            events.broker.listen()
+            found, cursor, resync = events.hub.wait(
+                str(request.user.pk), request.query_params.get('cursor') or None, max(0.0, min(timeout, max_timeout)),
+            )
+        finally:
+            _waiting.release()
+        return Response({'events': [_client_event(event) for event in found], 'cursor': cursor, 'resync': resync})
+
+
+class EventStreamView(APIView):
+    """
+    Server-Sent Events stream of new notifications and chat messages.
+
+    Events are named "notification" or "message" and carry the same JSON
+    data as the long-poll endpoint; a "resync" event means events may have
+    been missed. Between events the stream sends its current id every
+    EVENTS['HEARTBEAT'] seconds, and it closes after EVENTS['STREAM_SECONDS'];
+    EventSource then reconnects with Last-Event-ID and resumes.
+
+    Query Parameters:
+        token (str): Access token (EventSource cannot set headers)
+
+    The user is looked up again (through the user cache) between events,
+    so the stream of a deactivated user ends within the cache TIMEOUT.
+
+    A stream holds a worker thread while open, so the web process must run
+    threaded workers (see Procfile), and at most EVENTS['MAX_WAITING'] streams
+    and long-polls are served per process: above that the stream closes at
+    once, telling EventSource to reconnect after EVENTS['BUSY_RETRY'] seconds.
+    Django 3.2 iterates streaming responses on the event loop under ASGI,
+    where clients should long-poll instead.
+    """
+    authentication_classes = [QueryTokenJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        events.broker.listen()
+        cursor = request.META.get('HTTP_LAST_EVENT_ID') or request.query_params.get('cursor') or None
+        response = StreamingHttpResponse(self.stream(request.auth, str(request.user.pk), cursor),
+                                         content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+
+    def stream(self, token, user_id, cursor):
+        if not _waiting.acquire(blocking=False):
+            yield f"retry: {_events_config('BUSY_RETRY', 10) * 1000}\n\n"
+            return
+        try:
+            authenticator = QueryTokenJWTAuthentication()
+            heartbeat = _events_config('HEARTBEAT', 15)
+            deadline = time.monotonic() + _events_config('STREAM_SECONDS', 300)
+            yield 'retry: 3000\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    authenticator.get_user(token)
+                except AuthenticationFailed:
+                    return
+                found, cursor, resync = events.hub.wait(user_id, cursor, min(heartbeat, remaining))
+                if resync:
+                    yield self.message(cursor, 'resync', {})
+                for event in found:
+                    yield self.message(event['id'], event['type'], event['data'])
+                if not (found or resync):
+                    # An id-only message moves Last-Event-ID without firing an event
+                    yield f'id: {cursor}\n\n'
+        finally:
+            _waiting.release()
+
+    @staticmethod
+    def message(event_id, event_type, data):
+        return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
@@ -0,0 +1,44 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import work
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (see jobs/queue.py) until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Worker threads in this process')
+        parser.add_argument('--poll-interval', type=float, default=None, help='Seconds to sleep when idle')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping workers after their current job...')
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        threads = [
+            threading.Thread(
+                target=work,
+                args=(stop_event, options['poll_interval'], options['once']),
+                name=f'job-worker-{index}',
+                daemon=True,
+            )
+            for index in range(max(1, options['threads']))
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {len(threads)} job worker thread(s).'))
+
+        # join() with a timeout keeps the main thread responsive to signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+        self.stdout.write(self.style.SUCCESS('Job workers stopped.'))
@@ -0,0 +1,56 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:28
+
+from django.db import migrations, models
+import django.utils.timezone
+import djongo.models.fields
+
+
+# Finished jobs are kept this long for inspection, then removed by MongoDB
+DONE_JOB_RETENTION = 7 * 24 * 3600
+
+
+def create_job_indexes(apps, schema_editor):
+    """Indexes Django can't express: partial unique and TTL."""
+    Job = apps.get_model('jobs', 'Job')
+    collection = schema_editor.connection.cursor().db_conn[Job._meta.db_table]
+    collection.create_index(
+        'idempotency_key', name='job_idempotency_key', unique=True,
+        partialFilterExpression={'idempotency_key': {'$type': 'string'}},
+    )
+    collection.create_index(
+        'finished_at', name='job_done_ttl', expireAfterSeconds=DONE_JOB_RETENTION,
+        partialFilterExpression={'status': 'done'},
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('_id', djongo.models.fields.ObjectIdField(auto_created=True, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('payload', djongo.models.fields.JSONField(default=dict)),
+                ('idempotency_key', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('max_attempts', models.IntegerField(default=5)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_at'], name='job_status_run_at'),
+        ),
+        migrations.RunPython(create_job_indexes, migrations.RunPython.noop),
+    ]
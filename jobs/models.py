@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+from djongo import models as mongo_models
+
+
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    _id = mongo_models.ObjectIdField(primary_key=True)
+    name = models.CharField(max_length=100)
+    payload = mongo_models.JSONField(default=dict)
+    # Enqueueing the same key twice runs the job once (partial unique index)
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = mongo_models.DjongoManager()
+
+    @property
+    def id(self):
+        return self._id
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,178 @@
+"""
+Background Jobs
+
+A small MongoDB-backed job queue for side effects that should not run in
+the request thread (notification fan-out, for instance).
+
+- @job('name') registers a handler; handlers live in each app's jobs.py
+  and are called with the payload as keyword arguments.
+- enqueue() stores a job document and returns immediately. Jobs with the
+  same idempotency key are only stored once.
+- `manage.py run_workers` claims due jobs one at a time with an atomic
+  find_one_and_update, so any number of worker processes can share the
+  collection. Failed jobs are retried with exponential backoff up to
+  max_attempts; a job whose worker died is picked up again once its lease
+  (locked_until) has expired.
+- With JOBS['ALWAYS_EAGER'] jobs run synchronously inside enqueue()
+  (tests, or deployments without a worker process).
+- JOBS['PERIODIC'] maps job names to intervals in seconds. Workers queue
+  each of them once per interval; the idempotency key names the interval,
+  so there is a single run however many workers are polling.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import datetime
+import logging
+import threading
+import time
+import traceback
+
+from bson import ObjectId
+from django.conf import settings
+from django.utils import timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from core.documents import to_document
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_periodic_slots = {}
+_periodic_lock = threading.Lock()
+
+
+def _config(key, default):
+    return getattr(settings, 'JOBS', {}).get(key, default)
+
+
+# ============================================================================
+# REGISTRATION & ENQUEUEING
+# ============================================================================
+
+def job(name):
+    """Register the decorated function as the handler for jobs called `name`."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, delay=0, max_attempts=None):
+    """
+    Queue a job. `payload` must be JSON-serializable (pass ids as strings).
+
+    Returns:
+        The stored Job, or None when it ran eagerly or a job with the same
+        idempotency key already exists
+    """
+    payload = payload or {}
+    if _config('ALWAYS_EAGER', False):
+        _handlers[name](**payload)
+        return None
+
+    queued = Job(
+        _id=ObjectId(),
+        name=name,
+        payload=payload,
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts or _config('MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + datetime.timedelta(seconds=delay),
+    )
+    try:
+        Job.objects.mongo_insert_one(to_document(queued))
+    except DuplicateKeyError:
+        return None
+    return queued
+
+
+def enqueue_periodic():
+    """Queue the JOBS['PERIODIC'] jobs whose interval has started since the last call."""
+    now = time.time()
+    due = []
+    with _periodic_lock:
+        for name, interval in _config('PERIODIC', {}).items():
+            slot = int(now // interval)
+            if _periodic_slots.get(name) != slot:
+                _periodic_slots[name] = slot
+                due.append((name, slot))
+    for name, slot in due:
+        enqueue(name, idempotency_key=f'periodic:{name}:{slot}')
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+def claim_next():
+    """Atomically take the oldest due job (or one with an expired lease)."""
+    now = timezone.now()
+    return Job.objects.mongo_find_one_and_update(
+        {'$or': [
+            {'status': 'pending', 'run_at': {'$lte': now}},
+            {'status': 'running', 'locked_until': {'$lt': now}},
+        ]},
+        {
+            '$set': {
+                'status': 'running',
+                'locked_until': now + datetime.timedelta(seconds=_config('LEASE_SECONDS', 300)),
+            },
+            '$inc': {'attempts': 1},
+        },
+        sort=[('run_at', 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def run_job(doc):
+    """Run a claimed job document and record the outcome."""
+    name = doc['name']
+    try:
+        handler = _handlers.get(name)
+        if handler is None:
+            raise LookupError(f'No handler registered for job "{name}"')
+        handler(**(doc.get('payload') or {}))
+    except Exception:
+        _record_failure(doc, traceback.format_exc())
+        return False
+
+    Job.objects.mongo_update_one(
+        {'_id': doc['_id']},
+        {'$set': {'status': 'done', 'finished_at': timezone.now(), 'locked_until': None, 'last_error': ''}},
+    )
+    return True
+
+
+def _record_failure(doc, error):
+    now = timezone.now()
+    attempts = doc.get('attempts', 1)
+    if attempts >= doc.get('max_attempts', 1):
+        logger.error('Job %s (%s) failed permanently after %s attempts:\n%s', doc['_id'], doc['name'], attempts, error)
+        update = {'status': 'failed', 'finished_at': now}
+    else:
+        backoff = min(_config('RETRY_BACKOFF', 10) * 2 ** (attempts - 1), _config('MAX_BACKOFF', 3600))
+        logger.warning('Job %s (%s) failed, retrying in %ss:\n%s', doc['_id'], doc['name'], backoff, error)
+        update = {'status': 'pending', 'run_at': now + datetime.timedelta(seconds=backoff)}
+    update.update({'locked_until': None, 'last_error': error})
+    Job.objects.mongo_update_one({'_id': doc['_id']}, {'$set': update})
+
+
+def work(stop_event, poll_interval=None, exit_when_idle=False):
+    """
+    Process jobs until `stop_event` is set (or, with exit_when_idle, until
+    no job is due).
+    """
+    poll_interval = poll_interval if poll_interval is not None else _config('POLL_INTERVAL', 1.0)
+    while not stop_event.is_set():
+        enqueue_periodic()
+        doc = claim_next()
+        if doc is None:
+            if exit_when_idle:
+                return
+            stop_event.wait(poll_interval)
+            continue
+        run_job(doc)
@@ -0,0 +1,134 @@
+import datetime
+import threading
+
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.testing import MongomockTestCase
+from . import queue
+from .models import Job
+
+
+calls = []
+
+
+@queue.job('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@queue.job('tests.fail')
+def fail():
+    raise ValueError('boom')
+
+
+class JobQueueTests(MongomockTestCase):
+    settings_overrides = {'JOBS': {
+        'ALWAYS_EAGER': False, 'MAX_ATTEMPTS': 3, 'RETRY_BACKOFF': 10, 'MAX_BACKOFF': 3600,
+        'LEASE_SECONDS': 300, 'POLL_INTERVAL': 0, 'PERIODIC': {},
+    }}
+
+    def setUp(self):
+        super().setUp()
+        calls.clear()
+
+    def work(self):
+        queue.work(threading.Event(), exit_when_idle=True)
+
+    def assertAbout(self, moment, expected, slack=5):
+        self.assertLess(abs((moment - expected).total_seconds()), slack)
+
+    def test_enqueue_stores_a_pending_job(self):
+        queue.enqueue('tests.record', {'value': 1}, delay=60)
+        job = Job.objects.get(name='tests.record')
+        self.assertEqual(job.status, 'pending')
+        self.assertEqual(job.payload, {'value': 1})
+        self.assertEqual(job.max_attempts, 3)
+        self.assertAbout(job.run_at, timezone.now() + datetime.timedelta(seconds=60))
+
+    def test_idempotency_key_stores_the_job_once(self):
+        self.assertIsNotNone(queue.enqueue('tests.record', {'value': 1}, idempotency_key='once'))
+        self.assertIsNone(queue.enqueue('tests.record', {'value': 2}, idempotency_key='once'))
+        self.work()
+        self.assertEqual(calls, [1])
+        # The key stays taken after the job has run
+        self.assertIsNone(queue.enqueue('tests.record', {'value': 3}, idempotency_key='once'))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_jobs_without_a_key_are_all_stored(self):
+        queue.enqueue('tests.record', {'value': 1})
+        queue.enqueue('tests.record', {'value': 2})
+        self.work()
+        self.assertEqual(sorted(calls), [1, 2])
+
+    def test_work_runs_due_jobs(self):
+        queue.enqueue('tests.record', {'value': 1})
+        self.work()
+        job = Job.objects.get(name='tests.record')
+        self.assertEqual(calls, [1])
+        self.assertEqual((job.status, job.attempts, job.last_error), ('done', 1, ''))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_delayed_jobs_wait(self):
+        queue.enqueue('tests.record', {'value': 1}, delay=60)
+        self.assertIsNone(queue.claim_next())
+        self.assertEqual(calls, [])
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        queue.enqueue('tests.fail')
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.work()
+        job = Job.objects.get(name='tests.fail')
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertIn('ValueError: boom', job.last_error)
+        self.assertAbout(job.run_at, timezone.now() + datetime.timedelta(seconds=10))
+
+        Job.objects.mongo_update_one({'_id': job.pk}, {'$set': {'run_at': timezone.now()}})
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.work()
+        job = Job.objects.get(name='tests.fail')
+        self.assertEqual((job.status, job.attempts), ('pending', 2))
+        self.assertAbout(job.run_at, timezone.now() + datetime.timedelta(seconds=20))
+
+    def test_jobs_fail_after_max_attempts(self):
+        queue.enqueue('tests.fail', max_attempts=1)
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.work()
+        job = Job.objects.get(name='tests.fail')
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unknown_jobs_fail(self):
+        queue.enqueue('tests.missing', max_attempts=1)
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.work()
+        job = Job.objects.get(name='tests.missing')
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('No handler registered', job.last_error)
+
+    def test_expired_leases_are_claimed_again(self):
+        queue.enqueue('tests.record', {'value': 1})
+        claimed = queue.claim_next()
+        self.assertIsNone(queue.claim_next())
+
+        past = timezone.now() - datetime.timedelta(seconds=1)
+        Job.objects.mongo_update_one({'_id': claimed['_id']}, {'$set': {'locked_until': past}})
+        reclaimed = queue.claim_next()
+        self.assertEqual(reclaimed['_id'], claimed['_id'])
+        self.assertEqual(reclaimed['attempts'], 2)
+
+    def test_periodic_jobs_run_once_per_interval(self):
+        with override_settings(JOBS=dict(self.settings_overrides['JOBS'], PERIODIC={'tests.periodic': 3600})):
+            queue._periodic_slots.clear()
+            queue.enqueue_periodic()
+            queue.enqueue_periodic()
+            # Another worker polling in the same interval
+            queue._periodic_slots.clear()
+            queue.enqueue_periodic()
+        self.assertEqual(Job.objects.filter(name='tests.periodic').count(), 1)
+
+    def test_always_eager_runs_inline(self):
+        with override_settings(JOBS=dict(self.settings_overrides['JOBS'], ALWAYS_EAGER=True)):
+            self.assertIsNone(queue.enqueue('tests.record', {'value': 1}, idempotency_key='eager'))
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.count(), 0)
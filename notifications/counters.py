@@ -0,0 +1,87 @@
+"""
+Materialized unread counters.
+
+UnreadCounter.unread is moved with atomic `$inc` updates by everything that
+creates, reads or deletes notifications: the Notification signals in
+notifications/signals.py, bulk_notify() and the mark_as_read /
+mark_all_as_read actions (which only count the rows they actually flipped).
+unread_count() is then a single keyed read. reconcile_unread_counters()
+recounts from the notifications collection to repair drift; the job workers
+run it periodically (JOBS['PERIODIC']).
+"""
+
+from pymongo import UpdateOne
+from django.utils import timezone
+
+from .models import Notification, UnreadCounter
+
+
+def add_unread(deltas):
+    """
+    Apply unread count changes with one bulk write.
+
+    Args:
+        deltas: dict mapping user pk -> change in unread notifications
+    """
+    now = timezone.now()
+    requests = [
+        UpdateOne({'user_id': user_id}, {'$inc': {'unread': delta}, '$set': {'updated_at': now}}, upsert=True)
+        for user_id, delta in deltas.items() if delta
+    ]
+    if requests:
+        UnreadCounter.objects.mongo_bulk_write(requests, ordered=False)
+
+
+def unread_count(user_id):
+    doc = UnreadCounter.objects.mongo_find_one({'user_id': user_id}, {'unread': True})
+    return max(doc['unread'], 0) if doc else 0
+
+
+def count_unread():
+    """
+    Recount unread notifications per user with one `$group`.
+
+    Returns:
+        dict mapping user pk -> unread notifications
+    """
+    pipeline = [
+        {'$match': {'is_read': False}},
+        {'$group': {'_id': '$recipient_id', 'unread': {'$sum': 1}}},
+    ]
+    return {doc['_id']: doc['unread'] for doc in Notification.objects.mongo_aggregate(pipeline)}
+
+
+def reconcile_unread_counters():
+    """
+    Overwrite the counters that disagree with a fresh count.
+
+    The counters are read before counting, and each fix only applies if the
+    counter still holds the value read: an $inc that lands in between means
+    the count may already be out of date, so that user is left for the next
+    run instead of losing the increment.
+
+    Returns:
+        number of counters corrected
+    """
+    counters = {
+        doc['user_id']: doc.get('unread')
+        for doc in UnreadCounter.objects.mongo_find({}, {'user_id': True, 'unread': True})
+    }
+    counts = count_unread()
+    now = timezone.now()
+    requests = []
+    for user_id, current in counters.items():
+        unread = counts.pop(user_id, 0)
+        if current != unread:
+            requests.append(UpdateOne({'user_id': user_id, 'unread': current},
+                                      {'$set': {'unread': unread, 'updated_at': now}}))
+    # Users with unread notifications but no counter yet; one created in the
+    # meantime by add_unread() is left alone
+    requests.extend(
+        UpdateOne({'user_id': user_id}, {'$setOnInsert': {'unread': unread, 'updated_at': now}}, upsert=True)
+        for user_id, unread in counts.items()
+    )
+    if not requests:
+        return 0
+    result = UnreadCounter.objects.mongo_bulk_write(requests, ordered=False)
+    return result.modified_count + result.upserted_count
@@ -0,0 +1,110 @@
+"""
+Notification jobs, queued by notifications/signals.py and run by the job
+workers (see jobs/queue.py). Each job reloads what it needs by id and does
+nothing if the row has been deleted in the meantime. A failed job is run
+again, so rows are written with bulk_notify(), whose upserts don't create a
+second copy of a notification the first attempt already stored.
+"""
+
+from bson import ObjectId
+
+from attendance.models import LeaveRequest
+from jobs.queue import job
+from projects.models import ProjectMember
+from tasks.models import Task
+from .counters import reconcile_unread_counters
+from .models import Notification
+from .retention import archive_unread_notifications, ensure_read_ttl_index
+from .services import (
+    bulk_notify, invite_notification, notify_chat, publish_message, task_assigned_notification,
+)
+
+
+@job('notifications.leave_request')
+def notify_leave_request(leave_id):
+    leave = LeaveRequest.objects.filter(pk=ObjectId(leave_id)).first()
+    if leave is None or not leave.manager_id:
+        return
+    bulk_notify([Notification(
+        recipient_id=leave.manager_id,
+        sender=leave.employee,
+        notification_type='leave_request',
+        title='New Leave Request',
+        message=f'{leave.employee.first_name} has requested {leave.leave_type} leave from {leave.start_date} to {leave.end_date}.',
+        related_id=str(leave.pk)
+    )])
+
+
+@job('notifications.leave_status')
+def notify_leave_status(leave_id, status):
+    leave = LeaveRequest.objects.filter(pk=ObjectId(leave_id)).first()
+    if leave is None:
+        return
+    bulk_notify([Notification(
+        recipient_id=leave.employee_id,
+        sender_id=leave.manager_id,
+        notification_type=f'leave_{status}',
+        title=f'Leave {status.capitalize()}',
+        message=f'Your {leave.leave_type} leave request for {leave.start_date} has been {status}.',
+        related_id=str(leave.pk)
+    )])
+
+
+@job('notifications.project_invite')
+def notify_project_invite(membership_id):
+    membership = ProjectMember.objects.filter(pk=ObjectId(membership_id)).first()
+    if membership is None or membership.status != 'pending':
+        return
+    bulk_notify([invite_notification(membership.project, membership.user_id, membership.invited_by)])
+
+
+@job('notifications.task_assigned')
+def notify_task_assigned(task_id, user_ids):
+    task = Task.objects.filter(pk=ObjectId(task_id)).first()
+    if task is None:
+        return
+    # Built from the ids alone: no per-user lookups, one insert
+    bulk_notify(task_assigned_notification(task, ObjectId(user_id)) for user_id in user_ids)
+
+
+@job('notifications.chat_message')
+def notify_chat_message(message_id):
+    from chat.models import Message
+    message = Message.objects.filter(pk=ObjectId(message_id)).first()
+    if message is None:
+        return
+
+    # Only recipient ids are loaded; all notifications go out in one bulk write
+    recipient_ids = []
+    context = ""
+    related_id = ""
+
+    if message.task_id:
+        recipient_ids = Task.assigned_members.through.objects.filter(
+            task_id=message.task_id
+        ).values_list('user_id', flat=True)
+        context = f"in task: {message.task.title}"
+        related_id = str(message.task_id)
+    elif message.project_id:
+        recipient_ids = ProjectMember.objects.filter(
+            project_id=message.project_id, status='accepted'
+        ).values_list('user_id', flat=True)
+        context = f"in project: {message.project.name}"
+        related_id = str(message.project_id)
+
+    recipient_ids = set(recipient_ids) - {message.sender_id}
+    publish_message(message, recipient_ids)
+    notify_chat(message.sender, recipient_ids, context, related_id, message.timestamp)
+
+
+@job('notifications.reconcile_unread')
+def reconcile_unread():
+    # Queued every JOBS['PERIODIC'] interval by the workers
+    reconcile_unread_counters()
+
+
+@job('notifications.archive')
+def archive_notifications():
+    # Queued daily by the workers (JOBS['PERIODIC'])
+    ensure_read_ttl_index()
+    archive_unread_notifications()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from notifications.retention import archive_unread_notifications, ensure_read_ttl_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the read-notification TTL from settings.NOTIFICATIONS and move "
+        "old unread notifications into the monthly archive collection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive unread notifications older than this (default: ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Notifications moved per batch')
+
+    def handle(self, *args, **options):
+        ttl = ensure_read_ttl_index()
+        if ttl is None:
+            self.stdout.write('Read notifications are kept forever (READ_TTL_DAYS = 0).')
+        else:
+            self.stdout.write(f'Read notifications expire {ttl // 86400} day(s) after they were sent.')
+        archived = archive_unread_notifications(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} unread notification(s).'))
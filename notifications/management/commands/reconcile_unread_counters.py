@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.counters import reconcile_unread_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every user's unread notifications from the notifications "
+        "collection. Notification writes made while this runs may need another pass."
+    )
+
+    def handle(self, *args, **options):
+        drifted = reconcile_unread_counters()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled unread counters ({drifted} user(s) had drifted).'))
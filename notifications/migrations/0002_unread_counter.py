@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import djongo.models.fields
+
+
+def backfill_unread_counters(apps, schema_editor):
+    """Count the unread notifications of every user."""
+    Notification = apps.get_model('notifications', 'Notification')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    db = schema_editor.connection.cursor().db_conn
+    counts = db[Notification._meta.db_table].aggregate([
+        {'$match': {'is_read': False}},
+        {'$group': {'_id': '$recipient_id', 'unread': {'$sum': 1}}},
+    ])
+    now = django.utils.timezone.now()
+    counters = [{'user_id': doc['_id'], 'unread': doc['unread'], 'updated_at': now} for doc in counts]
+    if counters:
+        db[UnreadCounter._meta.db_table].insert_many(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('_id', djongo.models.fields.ObjectIdField(auto_created=True, primary_key=True, serialize=False)),
+                ('unread', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counter', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+def create_read_ttl_index(apps, schema_editor):
+    """TTL index on read notifications (READ_TTL_DAYS from settings)."""
+    from notifications.retention import ensure_read_ttl_index
+    Notification = apps.get_model('notifications', 'Notification')
+    ensure_read_ttl_index(schema_editor.connection.cursor().db_conn[Notification._meta.db_table])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_unread_counter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-_id'], name='notification_recipient_id'),
+        ),
+        migrations.RunPython(create_read_ttl_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+def coalesce_chat_notifications(apps, schema_editor):
+    """
+    Merge the unread chat notifications of each (recipient, channel) into
+    the newest one, then add the partial unique index that keeps them merged.
+    """
+    Notification = apps.get_model('notifications', 'Notification')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    db = schema_editor.connection.cursor().db_conn
+    notifications = db[Notification._meta.db_table]
+    counters = db[UnreadCounter._meta.db_table]
+    unread_chat = {'notification_type': 'chat_message', 'is_read': False}
+
+    notifications.update_many({'message_count': {'$exists': False}}, {'$set': {'message_count': 1}})
+    groups = notifications.aggregate([
+        {'$match': unread_chat},
+        {'$sort': {'created_at': -1}},
+        {'$group': {
+            '_id': {'recipient_id': '$recipient_id', 'related_id': '$related_id'},
+            'ids': {'$push': '$_id'},
+            'first': {'$last': '$created_at'},
+        }},
+        {'$match': {'ids.1': {'$exists': True}}},
+    ], allowDiskUse=True)
+    for group in groups:
+        keep, merged = group['ids'][0], group['ids'][1:]
+        notifications.update_one({'_id': keep}, {'$set': {
+            'message_count': len(group['ids']), 'created_at': group['first'],
+        }})
+        notifications.delete_many({'_id': {'$in': merged}})
+        counters.update_one({'user_id': group['_id']['recipient_id']}, {'$inc': {'unread': -len(merged)}})
+
+    notifications.create_index(
+        [('recipient_id', 1), ('related_id', 1)], name='notification_chat_unread', unique=True,
+        partialFilterExpression=unread_chat,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='message_count',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.RunPython(coalesce_chat_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:57
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_activity_at(apps, schema_editor):
+    """A row's last activity so far: its last coalesced message, or its creation."""
+    Notification = apps.get_model('notifications', 'Notification')
+    notifications = schema_editor.connection.cursor().db_conn[Notification._meta.db_table]
+    notifications.update_many({}, [{'$set': {'activity_at': {'$ifNull': ['$last_message_at', '$created_at']}}}])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_coalesced_chat_notifications'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_recipient_id',
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_activity_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-activity_at', '-_id'], name='notification_activity'),
+        ),
+    ]
@@ -23,6 +23,15 @@ class Notification(models.Model):
     related_id = models.CharField(max_length=255, null=True, blank=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    # Chat notifications are coalesced: one unread row per recipient and
+    # channel, counting the messages received since (notifications/services.py)
+    message_count = models.IntegerField(default=1)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Last time the row changed for its recipient: its creation, or the last
+    # message coalesced into it. Lists are sorted by it.
+    activity_at = models.DateTimeField(default=timezone.now)
+
+    objects = mongo_models.DjongoManager()
 
     @property
     def id(self):
@@ -30,6 +39,28 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's notifications, most recently active first (list and
+            # mark_all_as_read)
+            models.Index(fields=['recipient', '-activity_at', '-_id'], name='notification_activity'),
+        ]
 
     def __str__(self):
         return f"{self.recipient.email} - {self.title} ({self.notification_type})"
+
+
+class UnreadCounter(models.Model):
+    """
+    Number of unread notifications of a user, kept up to date by
+    notifications/counters.py so that polling unread_count is one keyed read.
+    A user without a counter has no unread notifications.
+    """
+    _id = mongo_models.ObjectIdField(primary_key=True)
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='unread_counter')
+    unread = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = mongo_models.DjongoManager()
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
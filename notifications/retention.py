@@ -0,0 +1,132 @@
+"""
+Notification retention.
+
+Every chat message leaves one notification per recipient, so the live
+collection is kept small in two ways (settings.NOTIFICATIONS):
+
+- Read notifications are removed by MongoDB itself, through a TTL index on
+  created_at limited to is_read=true, READ_TTL_DAYS after they were sent.
+- archive_unread_notifications() moves unread notifications idle for over
+  ARCHIVE_AFTER_DAYS into a compact archive collection: one document per
+  user and month holding the essential fields of each notification. The
+  unread counters are decreased accordingly.
+
+`manage.py archive_notifications` and the periodic notifications.archive
+job run both steps.
+"""
+
+import datetime
+from collections import Counter, defaultdict
+
+from bson import ObjectId
+from django.conf import settings
+from django.utils import timezone
+from pymongo import ASCENDING, UpdateOne
+
+from core.documents import collection_for, database
+from .counters import add_unread
+from .models import Notification
+
+
+READ_TTL_INDEX = 'notification_read_ttl'
+
+
+def _config(key, default):
+    return getattr(settings, 'NOTIFICATIONS', {}).get(key, default)
+
+
+def ensure_read_ttl_index(collection=None):
+    """
+    Create, update or (with READ_TTL_DAYS = 0) drop the TTL index on read
+    notifications so it matches the settings.
+
+    Returns:
+        the index's expireAfterSeconds, or None when retention is disabled
+    """
+    collection = collection if collection is not None else collection_for(Notification)
+    ttl = _config('READ_TTL_DAYS', 30) * 24 * 3600
+    existing = collection.index_information().get(READ_TTL_INDEX)
+    if ttl <= 0:
+        if existing:
+            collection.drop_index(READ_TTL_INDEX)
+        return None
+    if existing is None:
+        collection.create_index(
+            'created_at', name=READ_TTL_INDEX, expireAfterSeconds=ttl,
+            partialFilterExpression={'is_read': True},
+        )
+    elif existing.get('expireAfterSeconds') != ttl:
+        collection.database.command('collMod', collection.name, index={
+            'name': READ_TTL_INDEX, 'expireAfterSeconds': ttl,
+        })
+    return ttl
+
+
+def archive_collection():
+    collection = database()[_config('ARCHIVE_COLLECTION', 'notifications_archive')]
+    collection.create_index([('user_id', ASCENDING), ('month', ASCENDING)], name='archive_user_month', unique=True)
+    return collection
+
+
+def archive_entry(doc):
+    return {
+        '_id': doc['_id'],
+        'type': doc.get('notification_type'),
+        'title': doc.get('title'),
+        'message': doc.get('message'),
+        'related_id': doc.get('related_id'),
+        'sender_id': doc.get('sender_id'),
+        'created_at': doc.get('created_at'),
+        'message_count': doc.get('message_count', 1),
+    }
+
+
+def archive_unread_notifications(older_than_days=None, batch_size=None):
+    """
+    Move unread notifications without activity for `older_than_days`
+    (default ARCHIVE_AFTER_DAYS) into the monthly archive, batch by batch.
+
+    Entries are added with $addToSet before the live rows are deleted, so a
+    run interrupted between the two steps can simply be repeated.
+
+    Returns:
+        number of notifications archived
+    """
+    days = older_than_days if older_than_days is not None else _config('ARCHIVE_AFTER_DAYS', 90)
+    batch_size = batch_size or _config('ARCHIVE_BATCH_SIZE', 1000)
+    # ObjectIds embed their creation time, so the range is served by the _id
+    # index; activity_at keeps chat notifications that are still receiving
+    # messages
+    before = timezone.now() - datetime.timedelta(days=days)
+    cutoff = ObjectId.from_datetime(before)
+    archive = archive_collection()
+    archived = 0
+
+    while True:
+        docs = list(Notification.objects.mongo_find(
+            {'_id': {'$lt': cutoff}, 'activity_at': {'$lt': before}, 'is_read': False},
+            sort=[('_id', ASCENDING)], limit=batch_size,
+        ))
+        if not docs:
+            return archived
+
+        months = defaultdict(list)
+        for doc in docs:
+            created_at = doc.get('created_at') or doc['_id'].generation_time
+            months[(doc['recipient_id'], created_at.strftime('%Y-%m'))].append(archive_entry(doc))
+        archive.bulk_write([
+            UpdateOne({'user_id': user_id, 'month': month},
+                      {'$addToSet': {'notifications': {'$each': entries}}}, upsert=True)
+            for (user_id, month), entries in months.items()
+        ], ordered=False)
+
+        result = Notification.objects.mongo_delete_many({'_id': {'$in': [doc['_id'] for doc in docs]}, 'is_read': False})
+        # Rows marked as read meanwhile were not deleted, and their counter
+        # decrement already happened in mark_as_read
+        deleted = Counter(doc['recipient_id'] for doc in docs)
+        if result.deleted_count != len(docs):
+            remaining = {doc['_id'] for doc in Notification.objects.mongo_find(
+                {'_id': {'$in': [doc['_id'] for doc in docs]}}, {'_id': True})}
+            deleted = Counter(doc['recipient_id'] for doc in docs if doc['_id'] not in remaining)
+        add_unread({user_id: -count for user_id, count in deleted.items()})
+        archived += result.deleted_count
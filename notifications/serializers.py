@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from .models import Notification
-from authentication.serializers import UserSerializer
+from authentication.serializers import UserSerializer, UserPrefetchListSerializer
 
 class NotificationSerializer(serializers.ModelSerializer):
     id = serializers.CharField(source='_id', read_only=True)
+    recipient = serializers.CharField(source='recipient_id', read_only=True)
+    sender = serializers.CharField(source='sender_id', read_only=True)
     sender_details = UserSerializer(source='sender', read_only=True)
     
     class Meta:
@@ -11,6 +13,9 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'recipient', 'sender', 'sender_details', 
             'notification_type', 'title', 'message', 
-            'related_id', 'is_read', 'created_at'
+            'related_id', 'is_read', 'created_at', 'message_count', 'last_message_at', 'activity_at'
         )
-        read_only_fields = ('recipient', 'sender', 'notification_type', 'title', 'message', 'related_id', 'created_at')
+        read_only_fields = ('recipient', 'sender', 'notification_type', 'title', 'message', 'related_id', 'created_at',
+                            'message_count', 'last_message_at', 'activity_at')
+        list_serializer_class = UserPrefetchListSerializer
+        user_fields = ('sender',)
@@ -0,0 +1,153 @@
+"""
+Notification Services
+
+Builders for notification rows shared by the signal handlers and bulk code
+paths, bulk_notify() to store many notifications with one bulk write,
+notify_chat() for coalesced chat notifications, and the
+publish_*() helpers that push new rows to connected clients (core/events.py).
+"""
+
+from collections import Counter
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core import events
+from core.documents import to_document
+from .counters import add_unread
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+def invite_notification(project, recipient_id, invited_by):
+    return Notification(
+        recipient_id=recipient_id,
+        sender=invited_by,
+        notification_type='project_invite',
+        title='New Project Invitation',
+        message=f'You have been invited to join the project "{project.name}" by {invited_by.first_name}.',
+        related_id=str(project.pk),
+    )
+
+
+def task_assigned_notification(task, recipient_id):
+    return Notification(
+        recipient_id=recipient_id,
+        notification_type='task_assigned',
+        title='New Task Assigned',
+        message=f'You have been assigned to the task: {task.title}.',
+        related_id=str(task.pk),
+    )
+
+
+def notify_chat(sender, recipient_ids, context, related_id, sent_at):
+    """
+    Count a chat message in each recipient's unread notification for the
+    channel (`related_id`), creating it if there is none yet.
+
+    Chat notifications are coalesced: a busy channel leaves one row per
+    recipient until it is read, instead of one row per message, and each
+    message moves it back to the top of the list (activity_at). All
+    recipients are handled with a single bulk write of upserts; only the
+    rows actually created move the unread counters.
+
+    Returns:
+        the recipients' unread chat notifications for the channel
+    """
+    recipient_ids = list(recipient_ids)
+    if not recipient_ids:
+        return []
+    requests = [
+        UpdateOne(
+            {'recipient_id': recipient_id, 'notification_type': 'chat_message',
+             'related_id': related_id, 'is_read': False},
+            {
+                '$inc': {'message_count': 1},
+                '$set': {
+                    'sender_id': sender.pk,
+                    'title': 'New Message',
+                    'message': f'{sender.first_name} sent a message {context}.',
+                    'last_message_at': sent_at,
+                    'activity_at': sent_at,
+                },
+                '$setOnInsert': {'_id': ObjectId(), 'created_at': sent_at},
+            },
+            upsert=True,
+        )
+        for recipient_id in recipient_ids
+    ]
+    try:
+        upserted = Notification.objects.mongo_bulk_write(requests, ordered=False).upserted_ids
+    except BulkWriteError as exc:
+        # A concurrent job created some of these rows first (the partial
+        # unique index rejects the duplicates); they match on a second try
+        errors = exc.details['writeErrors']
+        if any(error['code'] != 11000 for error in errors):
+            raise
+        upserted = {item['index']: item['_id'] for item in exc.details['upserted']}
+        Notification.objects.mongo_bulk_write([requests[error['index']] for error in errors], ordered=False)
+    add_unread({recipient_ids[index]: 1 for index in upserted})
+
+    notifications = list(Notification.objects.filter(
+        recipient__in=recipient_ids, notification_type='chat_message', related_id=related_id, is_read__in=[False],
+    )) if events.enabled() else []
+    publish_notifications(notifications)
+    return notifications
+
+
+def bulk_notify(notifications):
+    """
+    Store unsaved Notification instances with a single bulk write.
+
+    Safe to repeat, so jobs can retry it: each row is an upsert keyed on
+    (recipient, type, related_id) among unread notifications, and leaves an
+    existing row as it is. post_save signals are not sent for these rows;
+    the ones created here are counted and published here.
+
+    Returns:
+        the notifications this call created
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return notifications
+    requests = []
+    for notification in notifications:
+        if notification.pk is None:
+            notification.pk = ObjectId()
+        document = to_document(notification)
+        requests.append(UpdateOne(
+            {'recipient_id': document['recipient_id'], 'notification_type': document['notification_type'],
+             'related_id': document['related_id'], 'is_read': False},
+            {'$setOnInsert': document},
+            upsert=True,
+        ))
+    upserted = Notification.objects.mongo_bulk_write(requests, ordered=False).upserted_ids
+
+    created = [notifications[index] for index in sorted(upserted)]
+    for notification in created:
+        notification._state.adding = False
+        notification._state.db = 'default'
+    add_unread(Counter(notification.recipient_id for notification in created if not notification.is_read))
+    publish_notifications(created)
+    return created
+
+
+def publish_notifications(notifications):
+    """Push saved notifications to their recipients, serialized as the REST API does."""
+    if not notifications or not events.enabled():
+        return
+    data = NotificationSerializer(notifications, many=True).data
+    events.publish(
+        events.event('notification', [notification.recipient_id], item)
+        for notification, item in zip(notifications, data)
+    )
+
+
+def publish_message(message, recipient_ids):
+    """Push a new chat message to the channel's members, the sender's other sessions included."""
+    if not events.enabled():
+        return
+    from chat.serializers import MessageSerializer
+    data = MessageSerializer([message], many=True).data[0]
+    events.publish([events.event('message', set(recipient_ids) | {message.sender_id}, data)])
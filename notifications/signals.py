@@ -1,86 +1,83 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
 from django.dispatch import receiver
-from .models import Notification
+from bson import ObjectId
 from attendance.models import LeaveRequest
+from jobs.queue import enqueue
 from projects.models import ProjectMember
 from tasks.models import Task
-from django.utils import timezone
+from .counters import add_unread
+from .models import Notification
+from .services import publish_notifications
+
+# Notifications are written by background jobs (notifications/jobs.py);
+# these handlers only queue them so requests don't wait on the fan-out.
+
+@receiver(post_init, sender=LeaveRequest)
+def remember_leave_status(sender, instance, **kwargs):
+    instance._saved_status = instance.__dict__.get('status')
+
+
+# Job keys stay taken once the job has run, so keys for events that can
+# repeat (a leave re-approved, a member re-assigned) carry a per-event part
 
 @receiver(post_save, sender=LeaveRequest)
 def leave_request_notification(sender, instance, created, **kwargs):
     if created:
-        if instance.manager:
-            Notification.objects.create(
-                recipient=instance.manager,
-                sender=instance.employee,
-                notification_type='leave_request',
-                title='New Leave Request',
-                message=f'{instance.employee.first_name} has requested {instance.leave_type} leave from {instance.start_date} to {instance.end_date}.',
-                related_id=str(instance.id)
-            )
-    else:
-        # Check if status changed
-        if instance.status in ['approved', 'rejected']:
-             # We might need to track old status, but for simplicity:
-             Notification.objects.create(
-                recipient=instance.employee,
-                sender=instance.manager,
-                notification_type=f'leave_{instance.status}',
-                title=f'Leave {instance.status.capitalize()}',
-                message=f'Your {instance.leave_type} leave request for {instance.start_date} has been {instance.status}.',
-                related_id=str(instance.id)
-            )
+        if instance.manager_id:
+            enqueue('notifications.leave_request', {'leave_id': str(instance.pk)},
+                    idempotency_key=f'leave_request:{instance.pk}')
+    elif instance.status != instance._saved_status and instance.status in ['approved', 'rejected']:
+        enqueue('notifications.leave_status', {'leave_id': str(instance.pk), 'status': instance.status},
+                idempotency_key=f'leave_{instance.status}:{instance.pk}:{instance.updated_at.isoformat()}')
+    instance._saved_status = instance.status
 
 @receiver(post_save, sender=ProjectMember)
 def project_invite_notification(sender, instance, created, **kwargs):
     if created and instance.status == 'pending':
-        Notification.objects.create(
-            recipient=instance.user,
-            sender=instance.invited_by,
-            notification_type='project_invite',
-            title='New Project Invitation',
-            message=f'You have been invited to join the project "{instance.project.name}" by {instance.invited_by.first_name}.',
-            related_id=str(instance.project.id)
-        )
+        enqueue('notifications.project_invite', {'membership_id': str(instance.pk)},
+                idempotency_key=f'project_invite:{instance.pk}')
 
 @receiver(m2m_changed, sender=Task.assigned_members.through)
 def task_assigned_notification(sender, instance, action, pk_set, **kwargs):
-    if action == "post_add":
-        from authentication.models import User
-        for user_id in pk_set:
-            user = User.objects.get(_id=user_id)
-            Notification.objects.create(
-                recipient=user,
-                notification_type='task_assigned',
-                title='New Task Assigned',
-                message=f'You have been assigned to the task: {instance.title}.',
-                related_id=str(instance.id)
-            )
+    if action == "post_add" and pk_set:
+        user_ids = sorted(str(user_id) for user_id in pk_set)
+        enqueue('notifications.task_assigned', {'task_id': str(instance.pk), 'user_ids': user_ids},
+                idempotency_key=f'task_assigned:{instance.pk}:{ObjectId()}')
 
 @receiver(post_save, sender='chat.Message')
 def chat_message_notification(sender, instance, created, **kwargs):
     if created:
-        recipients = []
-        context = ""
-        related_id = ""
-        
-        if instance.task:
-            recipients = instance.task.assigned_members.exclude(_id=instance.sender._id)
-            context = f"in task: {instance.task.title}"
-            related_id = str(instance.task.id)
-        elif instance.project:
-            from projects.models import ProjectMember
-            members = ProjectMember.objects.filter(project=instance.project, status='accepted').exclude(user=instance.sender)
-            recipients = [m.user for m in members]
-            context = f"in project: {instance.project.name}"
-            related_id = str(instance.project.id)
-            
-        for recipient in recipients:
-            Notification.objects.create(
-                recipient=recipient,
-                sender=instance.sender,
-                notification_type='chat_message',
-                title='New Message',
-                message=f'{instance.sender.first_name} sent a message {context}.',
-                related_id=related_id
-            )
+        enqueue('notifications.chat_message', {'message_id': str(instance.pk)},
+                idempotency_key=f'chat_message:{instance.pk}')
+
+# Rows written by bulk_notify() skip the signals below; it publishes and
+# counts them itself
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, **kwargs):
+    if created:
+        publish_notifications([instance])
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    # What the unread counter currently includes for rows loaded from the DB;
+    # new instances are handled by `created` in post_save
+    instance._counted_unread = instance.__dict__.get('is_read') is False
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_counter(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_unread = False if created else instance._counted_unread
+    if was_unread != (not instance.is_read):
+        add_unread({instance.recipient_id: -1 if was_unread else 1})
+    instance._counted_unread = not instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def release_unread_counter(sender, instance, **kwargs):
+    if instance._counted_unread:
+        add_unread({instance.recipient_id: -1})
+    instance._counted_unread = False
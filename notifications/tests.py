@@ -1,3 +1,84 @@
-from django.test import TestCase
+from bson import ObjectId
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from authentication.models import User
+from core.documents import insert_instances
+from core.testing import MongomockTestCase
+from .counters import add_unread, reconcile_unread_counters, unread_count
+from .models import Notification
+from .services import bulk_notify
+
+
+class UnreadCounterTests(MongomockTestCase):
+    settings_overrides = {'EVENTS': {'ENABLED': False}, 'PROFILING': {'ENABLED': False}}
+
+    def setUp(self):
+        super().setUp()
+        self.alice, self.bob = insert_instances(User, [
+            User(_id=ObjectId(), email=f'{name}@example.com', username=f'{name}@example.com')
+            for name in ('alice', 'bob')
+        ])
+
+    def notification(self, recipient, **fields):
+        fields.setdefault('notification_type', 'announcement')
+        return Notification(recipient=recipient, title='Notice', message='Test notification', **fields)
+
+    def test_saves_and_deletes_move_the_counter(self):
+        first = self.notification(self.alice)
+        first.save()
+        second = self.notification(self.alice)
+        second.save()
+        self.assertEqual(unread_count(self.alice.pk), 2)
+
+        first.is_read = True
+        first.save()
+        first.save()
+        self.assertEqual(unread_count(self.alice.pk), 1)
+
+        first.delete()
+        self.assertEqual(unread_count(self.alice.pk), 1)
+        Notification.objects.get(pk=second.pk).delete()
+        self.assertEqual(unread_count(self.alice.pk), 0)
+
+    def test_unread_count_is_never_negative(self):
+        add_unread({self.alice.pk: -3})
+        self.assertEqual(unread_count(self.alice.pk), 0)
+        self.assertEqual(unread_count(self.bob.pk), 0)
+
+    def test_bulk_notify_counts_the_rows_it_creates(self):
+        def assigned():
+            return [self.notification(user, notification_type='task_assigned', related_id='task-1')
+                    for user in (self.alice, self.bob)]
+
+        self.assertEqual(len(bulk_notify(assigned())), 2)
+        # A retried job leaves the unread rows alone
+        self.assertEqual(bulk_notify(assigned()), [])
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual((unread_count(self.alice.pk), unread_count(self.bob.pk)), (1, 1))
+
+    def test_marking_as_read_counts_only_rows_that_flip(self):
+        first, second = self.notification(self.alice), self.notification(self.alice)
+        first.save()
+        second.save()
+        client = APIClient()
+        client.force_authenticate(self.alice)
+
+        for _ in range(2):
+            response = client.post(f'/api/notifications/{first.pk}/mark_as_read/')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(unread_count(self.alice.pk), 1)
+
+        for _ in range(2):
+            client.post('/api/notifications/mark_all_as_read/')
+        self.assertEqual(unread_count(self.alice.pk), 0)
+
+    def test_reconcile_repairs_drifted_counters(self):
+        # Written without signals, so no counter follows them
+        insert_instances(Notification, [
+            self.notification(self.alice), self.notification(self.alice), self.notification(self.alice, is_read=True),
+        ])
+        add_unread({self.bob.pk: 5})
+
+        self.assertEqual(reconcile_unread_counters(), 2)
+        self.assertEqual((unread_count(self.alice.pk), unread_count(self.bob.pk)), (2, 0))
+        self.assertEqual(reconcile_unread_counters(), 0)
@@ -1,13 +1,18 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from .counters import add_unread, unread_count
 from .models import Notification
 from .serializers import NotificationSerializer
+from authentication.auth import ClaimsJWTAuthentication
 from bson import ObjectId
 
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Most recently active first: a chat notification moves back to the top
+    # with every message coalesced into it
+    cursor_ordering = ('-activity_at', '-_id')
 
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user)
@@ -16,9 +21,16 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def mark_as_read(self, request, pk=None):
         try:
             notification_id = ObjectId(pk) if isinstance(pk, str) and len(pk) == 24 else pk
-            notification = Notification.objects.get(_id=notification_id, recipient=request.user)
-            notification.is_read = True
-            notification.save()
+            # Conditional update: only the request that flips is_read
+            # decrements the unread counter
+            result = Notification.objects.mongo_update_one(
+                {'_id': notification_id, 'recipient_id': request.user.pk, 'is_read': False},
+                {'$set': {'is_read': True}},
+            )
+            if result.modified_count:
+                add_unread({request.user.pk: -1})
+            elif not Notification.objects.filter(_id=notification_id, recipient_id=request.user.pk).exists():
+                raise Notification.DoesNotExist
             return Response({'status': 'notification marked as read'})
         except Notification.DoesNotExist:
             return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -27,10 +39,13 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def mark_all_as_read(self, request):
-        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        result = Notification.objects.mongo_update_many(
+            {'recipient_id': request.user.pk, 'is_read': False}, {'$set': {'is_read': True}},
+        )
+        add_unread({request.user.pk: -result.modified_count})
         return Response({'status': 'all notifications marked as read'})
         
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], authentication_classes=[ClaimsJWTAuthentication])
     def unread_count(self, request):
-        count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-        return Response({'unread_count': count})
+        # One keyed read of the materialized counter (see counters.py)
+        return Response({'unread_count': unread_count(request.user.pk)})
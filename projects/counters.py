@@ -0,0 +1,85 @@
+"""
+Denormalized task counters on Project.
+
+Project.task_total / task_completed are kept up to date with atomic `$inc`
+updates from the Task signals in projects/signals.py, so reading a
+project's progress costs nothing. count_project_tasks() recomputes them
+from the tasks collection (used by the migration backfill and the
+rebuild_project_counters command to repair drift).
+"""
+
+from pymongo import UpdateOne
+
+from tasks.models import Task
+from .models import Project
+
+
+def progress_percent(total, completed):
+    if not total:
+        return 0
+    return round((completed / total) * 100, 2)
+
+
+def task_counter_state(task):
+    """(project_id, is_completed) of a task as currently loaded."""
+    # Read __dict__ so deferred fields are never fetched just for this
+    return task.__dict__.get('project_id'), task.__dict__.get('status') == 'completed'
+
+
+def apply_task_change(old_state, new_state):
+    """
+    Move a task's contribution from `old_state` to `new_state` (either may be
+    None for a created/deleted task) with one `$inc` per affected project.
+    """
+    deltas = {}
+    for state, sign in ((old_state, -1), (new_state, 1)):
+        if state is None or state[0] is None:
+            continue
+        project_id, completed = state
+        total_delta, completed_delta = deltas.get(project_id, (0, 0))
+        deltas[project_id] = (total_delta + sign, completed_delta + (sign if completed else 0))
+
+    for project_id, (total_delta, completed_delta) in deltas.items():
+        if total_delta or completed_delta:
+            Project.objects.mongo_update_one(
+                {'_id': project_id},
+                {'$inc': {'task_total': total_delta, 'task_completed': completed_delta}},
+            )
+
+
+def count_project_tasks(project_ids=None):
+    """
+    Recount tasks per project with one `$group` on the tasks collection.
+
+    Returns:
+        dict mapping project pk -> (total, completed)
+    """
+    match = {'project_id': {'$in': list(project_ids)} if project_ids is not None else {'$ne': None}}
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': '$project_id',
+            'total': {'$sum': 1},
+            'completed': {'$sum': {'$cond': [{'$eq': ['$status', 'completed']}, 1, 0]}},
+        }},
+    ]
+    return {doc['_id']: (doc['total'], doc['completed']) for doc in Task.objects.mongo_aggregate(pipeline)}
+
+
+def rebuild_task_counters():
+    """
+    Overwrite every project's counters with freshly counted values.
+
+    Returns:
+        number of projects whose stored counters were wrong
+    """
+    counts = count_project_tasks()
+    requests, drifted = [], 0
+    for doc in Project.objects.mongo_find({}, {'task_total': True, 'task_completed': True}):
+        total, completed = counts.get(doc['_id'], (0, 0))
+        if (doc.get('task_total'), doc.get('task_completed')) != (total, completed):
+            drifted += 1
+            requests.append(UpdateOne({'_id': doc['_id']}, {'$set': {'task_total': total, 'task_completed': completed}}))
+    if requests:
+        Project.objects.mongo_bulk_write(requests, ordered=False)
+    return drifted
@@ -0,0 +1,35 @@
+"""
+Batched loading for project list responses.
+
+ProjectSerializer renders every project's members, each with two nested
+users. Loaded per project that is the member rows plus their users for
+every project on the page; prefetch_project_members() loads them for the
+whole page at once.
+"""
+
+from authentication.loaders import prefetch_users
+from core.loaders import cache_prefetched
+from .models import ProjectMember
+
+
+def prefetch_project_members(projects):
+    """
+    Prefetch `members` for a list of projects, plus each member's user and
+    inviter (and their managers).
+
+    Issues three queries regardless of the number of projects: the
+    memberships, the users and the users' managers.
+    """
+    projects = [project for project in projects if not hasattr(project, '_prefetched_objects_cache')
+                or 'members' not in project._prefetched_objects_cache]
+    if not projects:
+        return
+
+    memberships = list(ProjectMember.objects.filter(project_id__in=[project.pk for project in projects]))
+    by_project = {}
+    for membership in memberships:
+        by_project.setdefault(membership.project_id, []).append(membership)
+
+    prefetch_users(memberships, 'user', 'invited_by')
+    for project in projects:
+        cache_prefetched(project, 'members', by_project.get(project.pk, []))
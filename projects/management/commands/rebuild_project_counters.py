@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from projects.counters import rebuild_task_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount task_total/task_completed for every project from the tasks "
+        "collection. Task writes made while this runs may need another pass."
+    )
+
+    def handle(self, *args, **options):
+        drifted = rebuild_task_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt project task counters ({drifted} project(s) had drifted).'))
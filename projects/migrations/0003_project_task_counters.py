@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:24
+
+from django.db import migrations, models
+
+
+def backfill_task_counters(apps, schema_editor):
+    """Count the existing tasks of every project."""
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    db = schema_editor.connection.cursor().db_conn
+    projects = db[Project._meta.db_table]
+
+    projects.update_many({}, {'$set': {'task_total': 0, 'task_completed': 0}})
+    counts = db[Task._meta.db_table].aggregate([
+        {'$match': {'project_id': {'$ne': None}}},
+        {'$group': {
+            '_id': '$project_id',
+            'total': {'$sum': 1},
+            'completed': {'$sum': {'$cond': [{'$eq': ['$status', 'completed']}, 1, 0]}},
+        }},
+    ])
+    for doc in counts:
+        projects.update_one({'_id': doc['_id']}, {'$set': {'task_total': doc['total'], 'task_completed': doc['completed']}})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_status'),
+        ('tasks', '0006_auto_20260208_1727'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='task_completed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_task_counters, migrations.RunPython.noop),
+    ]
@@ -15,10 +15,27 @@ class Project(models.Model):
         ('completed', 'Completed'),
     ), default='ongoing')
 
+    # Maintained by the Task signals in projects/signals.py, with $inc only
+    task_total = models.IntegerField(default=0)
+    task_completed = models.IntegerField(default=0)
+    COUNTER_FIELDS = ('task_total', 'task_completed')
+
+    objects = mongo_models.DjongoManager()
+
     @property
     def id(self):
         return self._id
 
+    def save(self, *args, **kwargs):
+        # An update writes every column from this instance, whose counters may
+        # be stale by now; leave them out so concurrent $incs are kept.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from .models import Project, ProjectMember
 from authentication.models import User
-from authentication.serializers import UserSerializer
+from authentication.serializers import UserSerializer, UserPrefetchListSerializer
 from bson import ObjectId
+from .counters import progress_percent
+from .loaders import prefetch_project_members
 
 class MongoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
     def to_internal_value(self, data):
@@ -34,6 +36,15 @@ class ProjectMemberSerializer(serializers.ModelSerializer):
         model = ProjectMember
         fields = ['id', 'project', 'user', 'user_details', 'status', 'role', 'invited_by', 'invited_by_details', 'joined_at']
         read_only_fields = ['status', 'invited_by', 'joined_at']
+        list_serializer_class = UserPrefetchListSerializer
+        user_fields = ('user', 'invited_by')
+
+class ProjectListSerializer(UserPrefetchListSerializer):
+    """Also loads the members of the whole page in bulk."""
+    def prefetch(self, items):
+        super().prefetch(items)
+        prefetch_project_members(items)
+
 
 class ProjectSerializer(serializers.ModelSerializer):
     members = ProjectMemberSerializer(many=True, read_only=True)
@@ -44,15 +55,13 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Project
-        fields = ['id', 'name', 'company_name', 'description', 'status', 'created_by', 'created_by_details', 'created_at', 'updated_at', 'members', 'progress']
-        read_only_fields = ['created_by', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'company_name', 'description', 'status', 'created_by', 'created_by_details', 'created_at', 'updated_at', 'members', 'progress', 'task_total', 'task_completed']
+        read_only_fields = ['created_by', 'created_at', 'updated_at', 'task_total', 'task_completed']
+        list_serializer_class = ProjectListSerializer
+        user_fields = ('created_by',)
 
     def get_progress(self, obj):
-        total_tasks = obj.tasks.count()
-        if total_tasks == 0:
-            return 0
-        completed_tasks = obj.tasks.filter(status='completed').count()
-        return round((completed_tasks / total_tasks) * 100, 2)
+        return progress_percent(obj.task_total, obj.task_completed)
 
 class ProjectInvitationSerializer(serializers.ModelSerializer):
     user = MongoPrimaryKeyRelatedField(queryset=User.objects.all())
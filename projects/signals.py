@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from tasks.models import Task
+from .counters import apply_task_change, task_counter_state
+
+
+@receiver(post_init, sender=Task)
+def remember_task_counter_state(sender, instance, **kwargs):
+    # For rows loaded from the DB this is what the project counters include;
+    # new instances are handled by `created` in post_save
+    instance._counter_state = task_counter_state(instance)
+
+
+@receiver(post_save, sender=Task)
+def update_project_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = None if created else getattr(instance, '_counter_state', None)
+    new_state = task_counter_state(instance)
+    if old_state != new_state:
+        apply_task_change(old_state, new_state)
+    instance._counter_state = new_state
+
+
+@receiver(post_delete, sender=Task)
+def release_project_counters(sender, instance, **kwargs):
+    apply_task_change(getattr(instance, '_counter_state', None) or task_counter_state(instance), None)
+    instance._counter_state = None
@@ -4,6 +4,11 @@ from rest_framework.response import Response
 from django.db.models import Q
 from .models import Project, ProjectMember
 from .serializers import ProjectSerializer, ProjectMemberSerializer, ProjectInvitationSerializer
+from .visibility import visible_project_ids
+from authentication.models import User
+from core.documents import insert_instances
+from notifications.services import bulk_notify, invite_notification
+from pymongo.errors import BulkWriteError
 from tasks.models import Task
 from tasks.serializers import TaskSerializer
 
@@ -15,22 +20,14 @@ class ProjectViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_anonymous:
             return Project.objects.none()
-        
-        # Admin can see all
-        if getattr(user, 'role', 'employee') == 'admin':
+
+        # Projects they created or are members of, resolved once per request
+        # (admins: None, i.e. all projects)
+        if not hasattr(self, '_visible_project_ids'):
+            self._visible_project_ids = visible_project_ids(user)
+        if self._visible_project_ids is None:
             return Project.objects.all()
-            
-        # For employees, get projects they created or are members of
-        # We manually combine and unique to avoid Djongo's distinct() issues
-        created_projects = Project.objects.filter(created_by=user)
-        membership_projects = Project.objects.filter(members__user=user)
-        
-        # Combine querysets using union or just return a list if DRF allows
-        # In Djongo, sometimes it's safer to just return a combined list of IDs and then filter
-        pks = set(list(created_projects.values_list('pk', flat=True)) + 
-                  list(membership_projects.values_list('pk', flat=True)))
-        
-        return Project.objects.filter(pk__in=pks)
+        return Project.objects.filter(pk__in=list(self._visible_project_ids))
 
     def get_object(self):
         from bson import ObjectId
@@ -81,31 +78,60 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response({'error': 'user_ids or user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         results = {'sent': [], 'skipped': [], 'errors': []}
-        
+
+        # Ensure we have ObjectIds for the user lookups, keeping request order
+        targets = {}
         for uid in user_ids:
             try:
-                # Ensure we have an ObjectId for the user lookup
-                if isinstance(uid, str) and len(uid) == 24:
-                    target_oid = ObjectId(uid)
-                else:
-                    target_oid = uid
-                
-                # Use user_id=target_oid to ensure Djongo matches correctly
-                if ProjectMember.objects.filter(project=project, user_id=target_oid).exists():
-                    results['skipped'].append(str(uid))
-                    continue
-                    
-                ProjectMember.objects.create(
+                target_oid = ObjectId(uid)
+            except Exception:
+                results['errors'].append({'id': str(uid), 'error': 'Invalid user ID'})
+                continue
+            if target_oid in targets:
+                results['skipped'].append(str(uid))
+            else:
+                targets[target_oid] = uid
+
+        # One $in query each for the users and for their existing memberships
+        known_users = set(User.objects.filter(pk__in=list(targets)).values_list('pk', flat=True))
+        existing = set(ProjectMember.objects.filter(
+            project_id=project.pk, user_id__in=list(targets)
+        ).values_list('user_id', flat=True))
+
+        invites = []
+        for target_oid, uid in targets.items():
+            if target_oid not in known_users:
+                results['errors'].append({'id': str(uid), 'error': 'User not found'})
+            elif target_oid in existing:
+                results['skipped'].append(str(uid))
+            else:
+                invites.append(ProjectMember(
                     project=project,
                     user_id=target_oid,
                     invited_by=request.user,
                     role=role,
                     status='pending'
-                )
-                results['sent'].append(str(uid))
-            except Exception as e:
-                results['errors'].append({'id': str(uid), 'error': str(e)})
-            
+                ))
+
+        # Memberships and their notifications are written with one insert each;
+        # rows lost to a concurrent invite (unique project/user) count as skipped
+        try:
+            insert_instances(ProjectMember, invites)
+        except BulkWriteError as e:
+            rejected = {error['index']: error for error in e.details.get('writeErrors', [])}
+            for index, error in rejected.items():
+                uid = str(targets[invites[index].user_id])
+                if error.get('code') == 11000:
+                    results['skipped'].append(uid)
+                else:
+                    results['errors'].append({'id': uid, 'error': error.get('errmsg', 'Insert failed')})
+            invites = [invite for index, invite in enumerate(invites) if index not in rejected]
+
+        bulk_notify(
+            invite_notification(project, invite.user_id, request.user) for invite in invites
+        )
+        results['sent'] = [str(targets[invite.user_id]) for invite in invites]
+
         status_code = status.HTTP_201_CREATED if results['sent'] else status.HTTP_200_OK
         return Response({
             'message': f'Invitations processed. Sent: {len(results["sent"])}, Skipped: {len(results["skipped"])}',
@@ -0,0 +1,62 @@
+"""
+Which projects a user can see.
+
+A project is visible to its creator and to everyone with a membership row
+(any status for browsing projects, 'accepted' for project chat). Both sets
+come back from one aggregation that starts at the user's own document and
+`$lookup`s the memberships and created projects through their indexed
+user columns, instead of separate queries per set.
+"""
+
+from authentication.models import User
+from .models import Project, ProjectMember
+
+
+def project_access(user_id):
+    """
+    Projects `user_id` created and projects they have a membership in.
+
+    Returns:
+        (set of created project ids, dict mapping project id -> membership status)
+    """
+    pipeline = [
+        {'$match': {'_id': user_id}},
+        {'$lookup': {
+            'from': ProjectMember._meta.db_table,
+            'localField': '_id',
+            'foreignField': 'user_id',
+            'as': 'memberships',
+        }},
+        {'$lookup': {
+            'from': Project._meta.db_table,
+            'localField': '_id',
+            'foreignField': 'created_by_id',
+            'as': 'created',
+        }},
+        {'$project': {
+            '_id': 0,
+            'memberships.project_id': 1,
+            'memberships.status': 1,
+            'created._id': 1,
+        }},
+    ]
+    doc = next(iter(User.objects.mongo_aggregate(pipeline)), None) or {}
+    created = {project['_id'] for project in doc.get('created', ())}
+    memberships = {row['project_id']: row.get('status') for row in doc.get('memberships', ())}
+    return created, memberships
+
+
+def visible_project_ids(user, member_statuses=None):
+    """
+    Ids of the projects `user` may see, or None for admins (no restriction).
+
+    Args:
+        member_statuses: Membership statuses that grant access (default: any)
+    """
+    if getattr(user, 'role', 'employee') == 'admin':
+        return None
+    created, memberships = project_access(user.pk)
+    return created | {
+        project_id for project_id, member_status in memberships.items()
+        if member_statuses is None or member_status in member_statuses
+    }
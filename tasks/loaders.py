@@ -0,0 +1,41 @@
+"""
+Batched loading for task list responses.
+
+TaskSerializer renders every assigned member (plus each member's manager)
+for every task. Loading those per task turns a 500-task list into thousands
+of queries; prefetch_task_members() loads them for the whole list with one
+query per relation instead.
+"""
+
+from authentication.models import User
+from core.loaders import cache_prefetched, load_by_ids, prefetch_foreign_key
+from .models import Task
+
+
+def prefetch_task_members(tasks):
+    """
+    Prefetch `assigned_members` (and their managers) for a list of tasks.
+
+    Issues three queries regardless of the number of tasks: the task/member
+    join table, the members and the members' managers.
+    """
+    tasks = [task for task in tasks if not hasattr(task, '_prefetched_objects_cache')
+             or 'assigned_members' not in task._prefetched_objects_cache]
+    if not tasks:
+        return
+
+    through = Task.assigned_members.through
+    links = through.objects.filter(
+        task_id__in=[task.pk for task in tasks]
+    ).values_list('task_id', 'user_id')
+
+    member_ids = {}
+    for task_id, user_id in links:
+        member_ids.setdefault(task_id, []).append(user_id)
+
+    users = load_by_ids(User, (uid for uids in member_ids.values() for uid in uids))
+    prefetch_foreign_key(users.values(), 'manager')
+
+    for task in tasks:
+        members = [users[uid] for uid in member_ids.get(task.pk, []) if uid in users]
+        cache_prefetched(task, 'assigned_members', members)
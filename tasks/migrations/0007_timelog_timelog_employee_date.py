@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_auto_20260208_1727'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['employee', '-date'], name='timelog_employee_date'),
+        ),
+    ]
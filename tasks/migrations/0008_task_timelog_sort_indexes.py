@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_timelog_timelog_employee_date'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timelog',
+            name='timelog_employee_date',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-deadline', '-_id'], name='task_deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['employee', 'date', '_id'], name='timelog_employee_date'),
+        ),
+    ]
@@ -22,9 +22,23 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = mongo_models.DjongoManager()
+
+    class Meta:
+        indexes = [
+            # Admin task list, most urgent first
+            models.Index(fields=['-deadline', '-_id'], name='task_deadline'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def is_assigned(self, user):
+        """Is `user` one of the assigned members?"""
+        # Looked up on the link table: filtering `assigned_members` makes
+        # Djongo join every user against it
+        return Task.assigned_members.through.objects.filter(task_id=self.pk, user_id=user.pk).exists()
+
 class TimeLog(models.Model):
     _id = mongo_models.ObjectIdField(primary_key=True)
 
@@ -40,8 +54,15 @@ class TimeLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = mongo_models.DjongoManager()
+
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # An employee's time logs by day (list, export, daily total check);
+            # _id keeps logs of the same day in a stable order
+            models.Index(fields=['employee', 'date', '_id'], name='timelog_employee_date'),
+        ]
 
     def __str__(self):
         return f"{self.employee.email} - {self.task.title} - {self.hours}h on {self.date}"
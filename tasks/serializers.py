@@ -1,6 +1,9 @@
+from django.db import models
 from rest_framework import serializers
 from .models import Task, TimeLog
-from authentication.serializers import UserSerializer
+from .loaders import prefetch_task_members
+from core.loaders import prefetch_foreign_key
+from authentication.serializers import UserSerializer, UserPrefetchListSerializer
 from authentication.models import User
 from bson import ObjectId
 
@@ -25,6 +28,17 @@ class MongoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
             return str(value.pk)
         return str(value)
 
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    Serializes a list of tasks with members and their managers loaded in
+    bulk (see tasks/loaders.py) instead of once per task.
+    """
+    def to_representation(self, data):
+        tasks = list(data.all() if isinstance(data, models.Manager) else data)
+        prefetch_task_members(tasks)
+        return super().to_representation(tasks)
+
+
 class TaskSerializer(serializers.ModelSerializer):
     id = serializers.CharField(source='_id', read_only=True)
     assigned_members_details = UserSerializer(source='assigned_members', many=True, read_only=True)
@@ -35,6 +49,7 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = '__all__'
+        list_serializer_class = TaskListSerializer
 
     def to_internal_value(self, data):
         print(f"DEBUG: TaskSerializer received: {data}", flush=True)
@@ -71,9 +86,17 @@ class TaskSerializer(serializers.ModelSerializer):
         return super().to_internal_value(data_copy)
 
     def get_assigned_members_names(self, obj):
+        # Reuses the members prefetched by TaskListSerializer when available
         return [f"{u.first_name} {u.last_name}" for u in obj.assigned_members.all()]
 
 
+class TimeLogListSerializer(UserPrefetchListSerializer):
+    """Also loads each log's task and the tasks' members in bulk."""
+    def prefetch(self, items):
+        super().prefetch(items)
+        prefetch_task_members(prefetch_foreign_key(items, 'task'))
+
+
 class TimeLogSerializer(serializers.ModelSerializer):
     id = serializers.CharField(source='_id', read_only=True)
     employee = MongoPrimaryKeyRelatedField(queryset=User.objects.all())
@@ -85,6 +108,8 @@ class TimeLogSerializer(serializers.ModelSerializer):
         model = TimeLog
         fields = ['id', 'employee', 'employee_details', 'task', 'task_details', 'date', 'hours', 'description', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+        list_serializer_class = TimeLogListSerializer
+        user_fields = ('employee',)
 
     def to_internal_value(self, data):
         data_copy = data.copy() if hasattr(data, 'copy') else data
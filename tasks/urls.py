@@ -2,7 +2,7 @@ from django.urls import path
 from .views import (
     MyTasksView, AssignTaskView, UpdateTaskView, TaskListView, 
     TaskDeleteView, TaskDetailView, TimeLogListCreateView, 
-    TimeLogDetailView, MyTimeLogsView
+    TimeLogDetailView, MyTimeLogsView, TimeLogExportView
 )
 
 urlpatterns = [
@@ -16,6 +16,7 @@ urlpatterns = [
     # TimeLog endpoints
     path('timelogs/', TimeLogListCreateView.as_view(), name='timelog_list_create'),
     path('timelogs/my/', MyTimeLogsView.as_view(), name='my_timelogs'),
+    path('timelogs/export/', TimeLogExportView.as_view(), name='timelog_export'),
     path('timelogs/<str:pk>/', TimeLogDetailView.as_view(), name='timelog_detail'),
 ]
 
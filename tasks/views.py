@@ -10,7 +10,6 @@ Includes task CRUD operations, assignment, and time tracking functionality.
 # ============================================================================
 from bson import ObjectId
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum
 
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
@@ -18,6 +17,8 @@ from rest_framework.views import APIView
 
 from .models import Task, TimeLog
 from .serializers import TaskSerializer, TimeLogSerializer
+from attendance.reports import scoped_employee_ids
+from core.exports import EXPORT_BATCH_SIZE, export_response, lookup_user, parse_export_params
 
 
 # ============================================================================
@@ -58,7 +59,12 @@ class MyTasksView(generics.ListAPIView):
 
     def get_queryset(self):
         """Filter tasks assigned to current user."""
-        return Task.objects.filter(assigned_members=self.request.user)
+        # Ids from the link table first: filtering on assigned_members makes
+        # Djongo join the link table onto every task
+        task_ids = Task.assigned_members.through.objects.filter(
+            user_id=self.request.user.pk
+        ).values_list('task_id', flat=True)
+        return Task.objects.filter(pk__in=list(task_ids))
 
 
 class TaskListView(generics.ListAPIView):
@@ -71,6 +77,7 @@ class TaskListView(generics.ListAPIView):
     queryset = Task.objects.all().order_by('-deadline')
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-deadline', '-_id')
 
 
 class AssignTaskView(generics.CreateAPIView):
@@ -153,6 +160,7 @@ class TimeLogListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = TimeLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-date', '-_id')
 
     def get_queryset(self):
         """
@@ -202,6 +210,57 @@ class TimeLogDetailView(generics.RetrieveUpdateDestroyAPIView):
         return get_object_or_404(self.get_queryset(), pk=pk)
 
 
+class TimeLogExportView(APIView):
+    """
+    Stream time logs in a date range as CSV or NDJSON (see core/exports.py).
+
+    Same scope as the attendance and leave exports (see
+    attendance.reports.report_scope): admins and HR export everyone's logs,
+    managers their own and their direct reports', employees their own.
+
+    Query Parameters:
+        start, end (str): Date range, YYYY-MM-DD
+        output (str): 'csv' (default) or 'ndjson'
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    columns = ['timelog_id', 'employee_id', 'employee_email', 'employee_name',
+               'task_id', 'task_title', 'date', 'hours', 'description']
+
+    def get(self, request):
+        """Stream the rows straight from a batched aggregation cursor."""
+        from datetime import datetime
+        start, end, export_format = parse_export_params(request)
+
+        match = {'date': {
+            '$gte': datetime(start.year, start.month, start.day),
+            '$lte': datetime(end.year, end.month, end.day),
+        }}
+        employee_ids = scoped_employee_ids(request.user)
+        if employee_ids is not None:
+            match['employee_id'] = {'$in': employee_ids}
+
+        pipeline = [
+            {'$match': match},
+            # Per employee, in (employee, date, _id) index order: no blocking sort
+            {'$sort': {'employee_id': 1, 'date': 1, '_id': 1}},
+            *lookup_user('employee_id', 'employee'),
+            {'$lookup': {
+                'from': Task._meta.db_table,
+                'localField': 'task_id',
+                'foreignField': '_id',
+                'as': 'task',
+            }},
+            {'$project': {
+                '_id': 0, 'timelog_id': '$_id', 'employee_id': 1, 'employee_email': 1, 'employee_name': 1,
+                'task_id': 1, 'task_title': {'$arrayElemAt': ['$task.title', 0]},
+                'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$date'}},
+                'hours': 1, 'description': 1,
+            }},
+        ]
+        documents = TimeLog.objects.mongo_aggregate(pipeline, batchSize=EXPORT_BATCH_SIZE, allowDiskUse=True)
+        return export_response(documents, self.columns, f'timelogs_{start}_{end}', export_format)
+
+
 class MyTimeLogsView(APIView):
     """
     Get current user's time logs with optional date filtering.
@@ -226,8 +285,8 @@ class MyTimeLogsView(APIView):
         date_from = request.query_params.get('date_from')
         date_to = request.query_params.get('date_to')
         
-        # Base queryset filtered to current user
-        queryset = TimeLog.objects.filter(employee=request.user)
+        # Base queryset filtered to current user, in index order
+        queryset = TimeLog.objects.filter(employee=request.user).order_by('-date', '-_id')
         
         # Apply date range filters if provided
         if date_from:
@@ -235,15 +294,18 @@ class MyTimeLogsView(APIView):
         if date_to:
             queryset = queryset.filter(date__lte=date_to)
         
-        # Calculate total hours logged
-        total_hours = queryset.aggregate(total=Sum('hours'))['total'] or 0
+        # One query: total and count come from the rows being serialized.
+        # (Djongo returns DecimalField values as Decimal128, which Sum()
+        # can't convert back, so the total can't be left to the database.)
+        time_logs = list(queryset)
+        total_hours = sum(float(str(log.hours)) for log in time_logs)
         
         # Serialize time log data
-        serializer = TimeLogSerializer(queryset, many=True)
+        serializer = TimeLogSerializer(time_logs, many=True)
         
         # Return response with data and statistics
         return Response({
             'time_logs': serializer.data,
-            'total_hours': float(total_hours),
-            'count': queryset.count()
+            'total_hours': total_hours,
+            'count': len(time_logs)
         })